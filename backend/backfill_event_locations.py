@@ -0,0 +1,48 @@
+"""
+Event location backfill
+Resolves the location of every existing event against the campus gazetteer and
+stores its coordinates and geohash. Safe to re-run, e.g. after adding places to
+the gazetteer.
+"""
+import asyncio
+
+from sqlalchemy import select
+
+from models.event import EventModel
+from services.event_service import locate_event
+from utils.database import AsyncSessionLocal, async_engine
+
+BATCH_SIZE = 500
+
+
+async def backfill_event_locations():
+    """Geocode all events, one committed batch at a time"""
+    print("Geocoding event locations...")
+    processed = 0
+    located = 0
+    last_id = None
+    try:
+        while True:
+            async with AsyncSessionLocal() as db:
+                query = select(EventModel).order_by(EventModel.id).limit(BATCH_SIZE)
+                if last_id is not None:
+                    query = query.where(EventModel.id > last_id)
+                events = (await db.scalars(query)).all()
+                if not events:
+                    break
+
+                for event_model in events:
+                    locate_event(event_model)
+                    located += event_model.geohash is not None
+                await db.commit()
+
+            processed += len(events)
+            last_id = events[-1].id
+            print(f"  {processed} events processed, {located} located")
+    finally:
+        await async_engine.dispose()
+    print("Event locations are up to date!")
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill_event_locations())
@@ -0,0 +1,45 @@
+"""
+Ingredient index backfill
+Parses the free-text ingredients of every existing meal into the ingredients and
+meals_ingredients tables. Safe to re-run: each meal's index is replaced, not appended.
+"""
+import asyncio
+
+from sqlalchemy import select
+
+from models.meal import MealModel
+from services.ingredient_service import sync_meal_ingredients
+from utils.database import AsyncSessionLocal, async_engine
+
+BATCH_SIZE = 500
+
+
+async def backfill_ingredients():
+    """Index the ingredients of all meals, one committed batch at a time"""
+    print("Indexing meal ingredients...")
+    indexed = 0
+    last_id = None
+    try:
+        while True:
+            async with AsyncSessionLocal() as db:
+                query = select(MealModel.id, MealModel.ingredients).order_by(MealModel.id).limit(BATCH_SIZE)
+                if last_id is not None:
+                    query = query.where(MealModel.id > last_id)
+                meals = (await db.execute(query)).all()
+                if not meals:
+                    break
+
+                for meal_id, ingredients in meals:
+                    await sync_meal_ingredients(meal_id, ingredients, db)
+                await db.commit()
+
+            indexed += len(meals)
+            last_id = meals[-1].id
+            print(f"  {indexed} meals indexed")
+    finally:
+        await async_engine.dispose()
+    print("Ingredient index is up to date!")
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill_ingredients())
@@ -0,0 +1,70 @@
+"""
+Concurrent-request throughput benchmark: blocking Session vs AsyncSession
+Simulates concurrent API requests that each run one query taking --delay seconds
+on the server, first through the blocking engine (how the service layer used to
+query) and then through the async engine the services now await.
+
+Usage (from backend/, against the database configured in .env):
+    python -m benchmarks.async_db --requests 200 --concurrency 50 --delay 0.05
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import func, select
+
+from utils.database import SessionLocal, AsyncSessionLocal, async_engine, engine
+
+
+async def blocking_request(delay: float) -> None:
+    """One request served the old way: a blocking query inside an async handler"""
+    db = SessionLocal()
+    try:
+        db.execute(select(func.pg_sleep(delay)))
+    finally:
+        db.close()
+
+
+async def async_request(delay: float) -> None:
+    """One request served through the async engine"""
+    async with AsyncSessionLocal() as db:
+        await db.execute(select(func.pg_sleep(delay)))
+
+
+async def run(request, total: int, concurrency: int, delay: float) -> float:
+    """Run total requests with at most concurrency in flight, returning requests per second"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded():
+        async with semaphore:
+            await request(delay)
+
+    # Warm up the pool so connection setup is not measured
+    await asyncio.gather(*(request(0) for _ in range(min(concurrency, 5))))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(bounded() for _ in range(total)))
+    return total / (time.perf_counter() - start)
+
+
+async def main(total: int, concurrency: int, delay: float) -> None:
+    print(f"{total} requests, concurrency {concurrency}, {delay * 1000:.0f} ms per query")
+
+    blocking = await run(blocking_request, total, concurrency, delay)
+    print(f"  blocking Session: {blocking:8.1f} req/s")
+
+    non_blocking = await run(async_request, total, concurrency, delay)
+    print(f"  AsyncSession:     {non_blocking:8.1f} req/s")
+    print(f"  speedup:          {non_blocking / blocking:8.1f}x")
+
+    engine.dispose()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.05, help="server-side query time in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.delay))
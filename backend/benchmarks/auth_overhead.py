@@ -0,0 +1,45 @@
+"""
+Auth overhead microbenchmark
+Measures the per-request cost of verifying a bearer token with a full JWT decode
+versus the verified-token cache used by utils.auth.get_current_user_id.
+
+Usage (from backend/):
+    python -m benchmarks.auth_overhead --iterations 20000
+"""
+import argparse
+import timeit
+
+from utils.auth import _token_cache, get_auth_cache_stats, verify_token_cached
+from utils.password import create_access_token, verify_token
+
+
+def main(iterations: int, sessions: int) -> None:
+    tokens = [create_access_token({"userId": f"user-{i}"}) for i in range(sessions)]
+
+    def uncached():
+        for token in tokens:
+            verify_token(token)
+
+    def cached():
+        for token in tokens:
+            verify_token_cached(token)
+
+    _token_cache.clear()
+    rounds = max(iterations // sessions, 1)
+    calls = rounds * sessions
+
+    uncached_seconds = timeit.timeit(uncached, number=rounds)
+    cached_seconds = timeit.timeit(cached, number=rounds)
+
+    print(f"{calls} verifications across {sessions} distinct tokens")
+    print(f"  jwt.decode every request: {uncached_seconds / calls * 1e6:8.2f} us/request")
+    print(f"  verified-token cache:     {cached_seconds / calls * 1e6:8.2f} us/request")
+    print(f"  token cache stats:        {get_auth_cache_stats()['token']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--sessions", type=int, default=100, help="number of distinct tokens in rotation")
+    args = parser.parse_args()
+    main(args.iterations, args.sessions)
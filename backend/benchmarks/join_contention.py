@@ -0,0 +1,107 @@
+"""
+Join contention benchmark
+Seeds one event with a small capacity and fires many simultaneous joins at it
+through event_service.join_event, each on its own session, then checks that the
+event was not overbooked.
+
+Usage (from backend/, against a disposable database configured in .env):
+    python -m benchmarks.join_contention --joins 500 --capacity 50
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select
+
+from models.event import EventModel
+from models.event_feed import EventFeedModel
+from models.event_participant import EventParticipantModel
+from models.event_waitlist import EventWaitlistModel
+from models.meal import MealModel
+from models.user import UserModel
+from services import event_service
+from utils.database import AsyncSessionLocal, async_engine
+
+
+async def seed(joins: int, capacity: int):
+    """Create a host, a meal, an event and one user per join attempt"""
+    host_id = str(uuid.uuid4())
+    meal_id = str(uuid.uuid4())
+    event_id = str(uuid.uuid4())
+    user_ids = [str(uuid.uuid4()) for _ in range(joins)]
+
+    async with AsyncSessionLocal() as db:
+        db.add(UserModel(id=host_id, name="bench host", email=f"{host_id}@bench.local", hashed_password="x"))
+        db.add_all(
+            UserModel(id=user_id, name="bench user", email=f"{user_id}@bench.local", hashed_password="x")
+            for user_id in user_ids
+        )
+        await db.flush()
+        db.add(MealModel(id=meal_id, user_id=host_id, title="bench meal", description="-", ingredients="-", is_deleted=False))
+        await db.flush()
+        db.add(EventModel(
+            id=event_id, host_user_id=host_id, meal_id=meal_id, title="bench dinner", description="-",
+            max_participants=capacity, current_participants=0, location="-",
+            event_date=datetime.now(timezone.utc) + timedelta(days=1), is_deleted=False
+        ))
+        await db.commit()
+    return host_id, meal_id, event_id, user_ids
+
+
+async def join(event_id: str, user_id: str) -> str:
+    async with AsyncSessionLocal() as db:
+        try:
+            await event_service.join_event({"user_id": user_id, "event_id": event_id}, db)
+            return "joined"
+        except HTTPException as e:
+            return e.detail
+
+
+async def cleanup(host_id: str, meal_id: str, event_id: str, user_ids) -> None:
+    async with AsyncSessionLocal() as db:
+        # Rows referencing the event go first
+        await db.execute(delete(EventParticipantModel).where(EventParticipantModel.event_id == event_id))
+        await db.execute(delete(EventWaitlistModel).where(EventWaitlistModel.event_id == event_id))
+        await db.execute(delete(EventFeedModel).where(EventFeedModel.event_id == event_id))
+        await db.execute(delete(EventModel).where(EventModel.id == event_id))
+        await db.execute(delete(MealModel).where(MealModel.id == meal_id))
+        await db.execute(delete(UserModel).where(UserModel.id.in_([host_id, *user_ids])))
+        await db.commit()
+
+
+async def main(joins: int, capacity: int) -> None:
+    host_id, meal_id, event_id, user_ids = await seed(joins, capacity)
+    try:
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(*(join(event_id, user_id) for user_id in user_ids))
+        elapsed = time.perf_counter() - start
+
+        async with AsyncSessionLocal() as db:
+            current = await db.scalar(select(EventModel.current_participants).where(EventModel.id == event_id))
+            rows = await db.scalar(
+                select(func.count()).select_from(EventParticipantModel).where(EventParticipantModel.event_id == event_id)
+            )
+
+        print(f"{joins} simultaneous joins on an event with {capacity} seats in {elapsed:.2f}s "
+              f"({joins / elapsed:.0f} joins/s)")
+        for outcome, count in Counter(outcomes).most_common():
+            print(f"  {outcome}: {count}")
+        print(f"  current_participants={current}, participant rows={rows}")
+
+        overbooked = current > capacity or rows > capacity or current != rows
+        print("  FAIL: event overbooked or count drifted" if overbooked else "  OK: no overbooking")
+    finally:
+        await cleanup(host_id, meal_id, event_id, user_ids)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--joins", type=int, default=500)
+    parser.add_argument("--capacity", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.joins, args.capacity))
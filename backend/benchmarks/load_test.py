@@ -0,0 +1,319 @@
+"""
+End-to-end HTTP load test
+Drives the API through realistic scenarios and reports throughput and p50/p95/p99
+latency per endpoint:
+
+    browse       paging through GET /events/ and opening event details
+    join_storm   every seeded user joining the same small event at once
+    login_burst  every seeded user logging in at once
+    search       profile searches through GET /users/search
+    upload       profile picture uploads
+
+By default the app is driven in-process with the local storage backend standing in
+for Supabase, against the database configured in .env (use a disposable one: seeded
+users, meals and events are left behind). Pass --base-url to hit a running server.
+
+Results can be saved as a baseline and later compared against it; the command exits
+non-zero when an endpoint's p95 regressed by more than --tolerance.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --save-baseline load_baseline.json
+    python -m benchmarks.load_test --compare load_baseline.json
+    python -m benchmarks.load_test --base-url http://localhost:8000 --scenarios browse search
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List
+
+import httpx
+
+SCENARIOS = ["browse", "join_storm", "login_burst", "search", "upload"]
+PASSWORD = "load-test-password"
+SEARCH_TERMS = ["load", "user", "ana", "bruno", "carla", "load user 1", "zz"]
+
+
+class Recorder:
+    """Latency samples and failures per endpoint, plus each scenario's wall time"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.durations: Dict[str, float] = {}
+        self.scenario_of: Dict[str, str] = {}
+
+    async def request(self, client: httpx.AsyncClient, scenario: str, endpoint: str, method: str, url: str,
+                      expected: Iterable[int] = (200, 201), **kwargs) -> httpx.Response:
+        name = f"{scenario} {endpoint}"
+        self.scenario_of[name] = scenario
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.samples[name].append(time.perf_counter() - started)
+        self.statuses[name][response.status_code] += 1
+        if response.status_code not in expected:
+            self.errors[name] += 1
+        return response
+
+    def report(self) -> Dict[str, dict]:
+        results = {}
+        for name, samples in self.samples.items():
+            ordered = sorted(samples)
+            duration = self.durations.get(self.scenario_of[name]) or sum(samples)
+            results[name] = {
+                "requests": len(ordered),
+                "errors": self.errors[name],
+                "statuses": {str(code): count for code, count in sorted(self.statuses[name].items())},
+                "throughput_rps": round(len(ordered) / duration, 2) if duration else 0.0,
+                "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+                "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+                "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+            }
+        return results
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+async def bounded(concurrency: int, coros) -> list:
+    """Run coroutines with at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(run(coro) for coro in coros))
+
+
+def sample_image() -> bytes:
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (1200, 900), (200, 120, 40)).save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+class Seed:
+    """Users, a meal and events created through the API before the timed scenarios run"""
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:8]
+        self.users: List[dict] = []
+        self.meal_id = None
+        self.event_ids: List[str] = []
+
+    async def signup(self, client: httpx.AsyncClient, index: int) -> dict:
+        email = f"load-{self.run_id}-{index}@load.local"
+        response = await client.post("/users/", json={
+            "name": f"Load User {index}", "email": email, "password": PASSWORD, "university": "Load University"
+        })
+        response.raise_for_status()
+        login = await client.post("/users/login", json={"email": email, "password": PASSWORD})
+        login.raise_for_status()
+        body = login.json()
+        return {"id": body["user"]["id"], "email": email, "headers": {"Authorization": f"Bearer {body['access_token']}"}}
+
+    async def users_and_events(self, client: httpx.AsyncClient, users: int, events: int, concurrency: int) -> None:
+        self.users = await bounded(concurrency, (self.signup(client, i) for i in range(users)))
+        host = self.users[0]
+        meal = await client.post("/meals/", headers=host["headers"], data={
+            "name": "Load test lasagna", "description": "Seeded by the load test", "ingredients": "pasta, tomato"
+        })
+        meal.raise_for_status()
+        meal_id = meal.json()["id"]
+
+        now = datetime.now(timezone.utc)
+
+        async def create_event(index: int) -> str:
+            response = await client.post("/events/", headers=host["headers"], data={
+                "title": f"Load dinner {index}", "description": "Seeded by the load test",
+                "max_participants": "8", "location": "Dorm kitchen", "meal_id": meal_id,
+                "event_date": (now + timedelta(days=1, minutes=index)).isoformat(), "price": str(index % 30),
+            })
+            response.raise_for_status()
+            return response.json()["id"]
+
+        self.event_ids = await bounded(concurrency, (create_event(i) for i in range(events)))
+        self.meal_id = meal_id
+
+
+async def browse(client, recorder: Recorder, seed: Seed, requests: int, concurrency: int) -> None:
+    cursors = [None]
+
+    async def page(index: int):
+        params = {"limit": 20}
+        cursor = cursors[index % len(cursors)]
+        if cursor:
+            params["cursor"] = cursor
+        response = await recorder.request(client, "browse", "GET /events/", "GET", "/events/", params=params)
+        next_cursor = response.headers.get("x-next-cursor")
+        if next_cursor and len(cursors) < 50:
+            cursors.append(next_cursor)
+
+    async def details(index: int):
+        event_id = seed.event_ids[index % len(seed.event_ids)]
+        await recorder.request(client, "browse", "GET /events/{event_id}", "GET", f"/events/{event_id}")
+
+    await bounded(concurrency, (
+        page(i) if i % 2 == 0 else details(i) for i in range(requests)
+    ))
+
+
+async def join_storm(client, recorder: Recorder, seed: Seed, requests: int, concurrency: int) -> None:
+    host = seed.users[0]
+    response = await client.post("/events/", headers=host["headers"], data={
+        "title": "Load join storm", "description": "Everyone at once", "max_participants": "20",
+        "location": "Dorm kitchen", "meal_id": seed.meal_id,
+        "event_date": (datetime.now(timezone.utc) + timedelta(days=2)).isoformat(),
+    })
+    response.raise_for_status()
+    event_id = response.json()["id"]
+
+    # Losing the race for a seat is a normal outcome, not an error
+    await bounded(concurrency, (
+        recorder.request(client, "join_storm", "POST /events/join/", "POST", "/events/join/",
+                         expected=(200, 400, 409), headers=user["headers"], json={"event_id": event_id})
+        for user in seed.users[1:]
+    ))
+
+
+async def login_burst(client, recorder: Recorder, seed: Seed, requests: int, concurrency: int) -> None:
+    await bounded(concurrency, (
+        recorder.request(client, "login_burst", "POST /users/login", "POST", "/users/login",
+                         json={"email": user["email"], "password": PASSWORD})
+        for user in seed.users
+    ))
+
+
+async def search(client, recorder: Recorder, seed: Seed, requests: int, concurrency: int) -> None:
+    await bounded(concurrency, (
+        recorder.request(client, "search", "GET /users/search", "GET", "/users/search",
+                         params={"query": SEARCH_TERMS[i % len(SEARCH_TERMS)], "limit": 10})
+        for i in range(requests)
+    ))
+
+
+async def upload(client, recorder: Recorder, seed: Seed, requests: int, concurrency: int) -> None:
+    image = sample_image()
+    users = seed.users[:max(min(requests, len(seed.users)), 1)]
+    await bounded(concurrency, (
+        recorder.request(client, "upload", "POST /users/{user_id}/profile-picture", "POST",
+                         f"/users/{user['id']}/profile-picture", headers=user["headers"],
+                         files={"image": ("load.jpg", image, "image/jpeg")})
+        for user in users
+    ))
+
+
+SCENARIO_FUNCTIONS = {
+    "browse": browse,
+    "join_storm": join_storm,
+    "login_burst": login_burst,
+    "search": search,
+    "upload": upload,
+}
+
+
+def print_results(results: Dict[str, dict]) -> None:
+    print(f"{'endpoint':52} {'reqs':>6} {'errs':>5} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, row in results.items():
+        print(f"{name:52} {row['requests']:6d} {row['errors']:5d} {row['throughput_rps']:8.1f} "
+              f"{row['p50_ms']:9.2f} {row['p95_ms']:9.2f} {row['p99_ms']:9.2f}")
+
+
+def compare(results: Dict[str, dict], baseline_path: str, tolerance: float) -> bool:
+    """Print p95 changes against a saved baseline; False when any endpoint regressed"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["endpoints"]
+
+    ok = True
+    print(f"\nCompared with {baseline_path} (tolerance {tolerance:.0%} on p95):")
+    for name, row in results.items():
+        before = baseline.get(name)
+        if not before:
+            print(f"  {name}: not in baseline")
+            continue
+        change = (row["p95_ms"] - before["p95_ms"]) / before["p95_ms"] if before["p95_ms"] else 0.0
+        regressed = change > tolerance or row["errors"] > before["errors"]
+        ok = ok and not regressed
+        print(f"  {name}: p95 {before['p95_ms']:.2f} -> {row['p95_ms']:.2f} ms ({change:+.0%}), "
+              f"errors {before['errors']} -> {row['errors']}{'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+async def main(args) -> bool:
+    if args.base_url:
+        transport, base_url = None, args.base_url
+        app = None
+    else:
+        # Must be set before the app (and its storage backend) is imported
+        os.environ.setdefault("STORAGE_BACKEND", "local")
+        os.environ.setdefault("LOCAL_STORAGE_DIR", tempfile.mkdtemp(prefix="load-test-storage-"))
+        from main import app
+        transport, base_url = httpx.ASGITransport(app=app), "http://load-test"
+
+    recorder = Recorder()
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60) as client:
+        seed = Seed()
+        print(f"Seeding {args.users} users and {args.events} events...")
+        await seed.users_and_events(client, args.users, args.events, args.concurrency)
+
+        for scenario in args.scenarios:
+            started = time.perf_counter()
+            await SCENARIO_FUNCTIONS[scenario](client, recorder, seed, args.requests, args.concurrency)
+            recorder.durations[scenario] = time.perf_counter() - started
+
+    if app is not None:
+        # The app's shutdown hooks do not run under ASGITransport
+        from utils.database import async_engine
+        from utils.images import image_pool
+        from utils.password import password_pool
+        await async_engine.dispose()
+        password_pool.shutdown()
+        image_pool.shutdown()
+
+    results = recorder.report()
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "target": args.base_url or "in-process",
+                "settings": {key: getattr(args, key) for key in ("users", "events", "requests", "concurrency")},
+                "endpoints": results,
+            }, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.compare:
+        return compare(results, args.compare, args.tolerance)
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="Load test a running server instead of the in-process app")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--users", type=int, default=100, help="Users to seed (join storm and login burst size)")
+    parser.add_argument("--events", type=int, default=200, help="Events to seed for browsing")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per browse/search scenario, uploads are capped at --users")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 increase before failing, as a fraction")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args)) else 1)
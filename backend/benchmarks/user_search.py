@@ -0,0 +1,121 @@
+"""
+User search benchmark
+Fills the users table with synthetic users (1M by default) and times the old
+leading-wildcard ILIKE search against user_service.search_users, with the planner
+first kept away from indexes (what the old search got: a sequential scan) and
+then free to use the trigram indexes.
+
+Requires the pg_trgm extension and indexes created by init_db.py. The synthetic
+users are deleted afterwards.
+
+Usage (from backend/, against a disposable database configured in .env):
+    python -m benchmarks.user_search --users 1000000 --repeat 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import select, text
+
+from models.user import UserModel
+from services.user_service import search_users
+from utils.database import AsyncSessionLocal, async_engine
+
+FIRST_NAMES = [
+    "Ana", "Bruno", "Carla", "Diego", "Eduarda", "Felipe", "Gabriela", "Heitor", "Isabela", "João",
+    "Karina", "Lucas", "Mariana", "Nicolas", "Olivia", "Pedro", "Rafaela", "Samuel", "Tatiana", "Vinicius",
+]
+LAST_NAMES = [
+    "Almeida", "Barbosa", "Cardoso", "Dias", "Esteves", "Ferreira", "Gomes", "Honorato", "Lima", "Martins",
+    "Nogueira", "Oliveira", "Pereira", "Queiroz", "Ribeiro", "Santos", "Teixeira", "Vieira", "Xavier", "Zanetti",
+]
+UNIVERSITIES = ["USP", "Unicamp", "UFRJ", "UFMG", "UnB", "PUC-Rio", "UFRGS", "UFPE"]
+# Common, rare and misspelled queries, as typed into the search box
+QUERIES = ["ana", "mariana oli", "pereira", "vinicus", "zanetti 42", "xq"]
+SEED_EMAIL_PATTERN = "bench-%@bench.local"
+
+
+async def seed(users: int) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("""
+            INSERT INTO users (id, name, email, hashed_password, university)
+            SELECT gen_random_uuid(),
+                   first_names[1 + (i * 7) % cardinality(first_names)] || ' '
+                       || last_names[1 + (i * 13) % cardinality(last_names)] || ' ' || (i % 1000),
+                   'bench-' || i || '@bench.local',
+                   'x',
+                   universities[1 + i % cardinality(universities)]
+            FROM generate_series(1, :users) AS i,
+                 CAST(:first_names AS text[]) AS first_names,
+                 CAST(:last_names AS text[]) AS last_names,
+                 CAST(:universities AS text[]) AS universities
+            ON CONFLICT (email) DO NOTHING
+        """), {"users": users, "first_names": FIRST_NAMES, "last_names": LAST_NAMES, "universities": UNIVERSITIES})
+        await db.commit()
+    async with async_engine.connect() as connection:
+        await connection.execute(text("ANALYZE users"))
+        await connection.commit()
+
+
+async def cleanup() -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("DELETE FROM users WHERE email LIKE :pattern"), {"pattern": SEED_EMAIL_PATTERN})
+        await db.commit()
+
+
+async def legacy_search(query: str, db) -> list:
+    """The search as it was: unranked, leading-wildcard ILIKE"""
+    return (await db.scalars(select(UserModel).where(UserModel.name.ilike(f"%{query}%")).limit(10))).all()
+
+
+async def indexed_search(query: str, db) -> list:
+    users, _ = await search_users(query, db, 10)
+    return users
+
+
+async def time_search(search, query: str, repeat: int, use_indexes: bool) -> float:
+    """Median latency in milliseconds"""
+    timings = []
+    async with AsyncSessionLocal() as db:
+        if not use_indexes:
+            await db.execute(text("SET LOCAL enable_bitmapscan = off"))
+            await db.execute(text("SET LOCAL enable_indexscan = off"))
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await search(query, db)
+            timings.append((time.perf_counter() - started) * 1000)
+        await db.rollback()
+    return statistics.median(timings)
+
+
+async def main(users: int, repeat: int, keep: bool) -> None:
+    print(f"Seeding {users} synthetic users...")
+    started = time.perf_counter()
+    await seed(users)
+    print(f"  done in {time.perf_counter() - started:.1f}s")
+
+    try:
+        print(f"\nMedian latency over {repeat} runs (ms)")
+        print(f"{'query':14} {'ILIKE, seq scan':>16} {'ILIKE, indexed':>15} {'ranked, seq scan':>17} {'ranked, indexed':>16}")
+        for query in QUERIES:
+            row = [
+                await time_search(legacy_search, query, repeat, use_indexes=False),
+                await time_search(legacy_search, query, repeat, use_indexes=True),
+                await time_search(indexed_search, query, repeat, use_indexes=False),
+                await time_search(indexed_search, query, repeat, use_indexes=True),
+            ]
+            print(f"{query:14} {row[0]:16.2f} {row[1]:15.2f} {row[2]:17.2f} {row[3]:16.2f}")
+    finally:
+        if not keep:
+            await cleanup()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="Leave the synthetic users in place for reruns")
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.repeat, args.keep))
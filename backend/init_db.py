@@ -2,17 +2,26 @@
 Database initialization script
 Creates all tables defined in SQLAlchemy models
 """
+from sqlalchemy import text
+
 from utils.database import engine, Base
 
 from models.user import UserModel
 from models.event import EventModel
 from models.event_participant import EventParticipantModel
 from models.meal import MealModel
+from models.ingredient import IngredientModel, MealIngredientModel
+from models.event_feed import EventFeedModel
+from models.event_waitlist import EventWaitlistModel
+from models.job import JobModel
 
 
 def init_database():
     """Create all tables in the database"""
     print("Creating database tables...")
+    with engine.begin() as connection:
+        # Trigram operator classes used by the user search indexes
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
     Base.metadata.create_all(bind=engine)
     print("Database tables created successfully!")
 
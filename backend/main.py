@@ -1,14 +1,32 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
+import os
+import time
+import uuid
 
-from routers import users, events, meals
+from routers import users, events, meals, health
+from utils.images import image_pool
+from utils.live import live_hub
+from utils.logger import setup_logging, shutdown_logging, get_logger, request_id_var, should_log_request
+from utils.metrics import HTTP_REQUESTS_IN_FLIGHT, METRICS_CONTENT_TYPE, UNMATCHED_ROUTE, observe_request, render_metrics
+from utils.password import password_pool
+from utils.query_stats import QUERY_COUNT_HEADER, QUERY_TIME_HEADER, start_query_stats, finish_query_stats, warn_repeated_queries
+from utils.storage import STORAGE_BACKEND, LOCAL_STORAGE_DIR
+from utils.uploads import UploadSizeLimitMiddleware
 
 load_dotenv()
 
+setup_logging()
+access_logger = get_logger("access")
+
 # Initialize FastAPI app
 app = FastAPI(title="Dorm Made - Culinary Social Network", version="1.0.0")
 
+# Reject oversized uploads while they stream in (added first so CORS headers still wrap its 413s)
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -19,29 +37,84 @@ app.add_middleware(
     expose_headers=["*"],  # Expose all headers
 )
 
-# Debug middleware to log all requests
+# Access log and request metrics: one structured line and one observation per request,
+# both keyed by route template so /events/{event_id} is one route, plus the SQL it ran
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    print(f"[REQUEST] {request.method} {request.url.path}")
-    print(f"[REQUEST] Query params: {dict(request.query_params)}")
-    auth_header = request.headers.get("authorization")
-    if auth_header:
-        print(f"[REQUEST] Authorization: {auth_header[:20]}...")
-    else:
-        print(f"[REQUEST] Authorization: Missing")
-    response = await call_next(request)
-    print(f"[RESPONSE] {response.status_code}")
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    stats_token = start_query_stats()
+    started = time.perf_counter()
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)
+    except Exception:
+        route = request.scope.get("route")
+        observe_request(request.method, route.path if route else UNMATCHED_ROUTE, 500, time.perf_counter() - started)
+        access_logger.exception(
+            "request failed",
+            extra={"method": request.method, "path": request.url.path}
+        )
+        raise
+    finally:
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+        query_stats = finish_query_stats(stats_token)
+        request_id_var.reset(token)
+
+    elapsed = time.perf_counter() - started
+    latency_ms = elapsed * 1000
+    response.headers["X-Request-ID"] = request_id
+    response.headers[QUERY_COUNT_HEADER] = str(query_stats.count)
+    response.headers[QUERY_TIME_HEADER] = str(query_stats.time_ms)
+
+    route = request.scope.get("route")
+    observe_request(request.method, route.path if route else UNMATCHED_ROUTE, response.status_code, elapsed)
+    warn_repeated_queries(query_stats, route.path if route else request.url.path, request_id)
+
+    route_key = f"{request.method} {route.path if route else request.url.path}"
+    if should_log_request(route_key, response.status_code, latency_ms):
+        access_logger.info(
+            "request",
+            extra={
+                "request_id": request_id,
+                "method": request.method,
+                "path": request.url.path,
+                "route": route.path if route else None,
+                "status": response.status_code,
+                "latency_ms": round(latency_ms, 2),
+                "db_queries": query_stats.count,
+                "db_time_ms": query_stats.time_ms,
+            }
+        )
     return response
 
 # Include routers
 app.include_router(users.router)
 app.include_router(events.router)
 app.include_router(meals.router)
+app.include_router(health.router)
+
+# Serve the local storage stand-in, so uploaded images resolve without Supabase
+if STORAGE_BACKEND == "local":
+    os.makedirs(LOCAL_STORAGE_DIR, exist_ok=True)
+    app.mount("/storage", StaticFiles(directory=LOCAL_STORAGE_DIR), name="storage")
+
+@app.on_event("shutdown")
+async def shutdown_background_workers():
+    password_pool.shutdown()
+    image_pool.shutdown()
+    await live_hub.stop()
+    shutdown_logging()
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to Dorm Made - Culinary Social Network API"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(content=render_metrics(), headers={"Content-Type": METRICS_CONTENT_TYPE})
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
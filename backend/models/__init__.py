@@ -2,5 +2,9 @@ from .user import UserModel
 from .event import EventModel
 from .event_participant import EventParticipantModel
 from .meal import MealModel
+from .ingredient import IngredientModel, MealIngredientModel
+from .event_feed import EventFeedModel
+from .event_waitlist import EventWaitlistModel
+from .job import JobModel
 
-__all__ = ["UserModel", "EventModel", "EventParticipantModel", "MealModel"]
\ No newline at end of file
+__all__ = ["UserModel", "EventModel", "EventParticipantModel", "MealModel", "IngredientModel", "MealIngredientModel", "EventFeedModel", "EventWaitlistModel", "JobModel"]
\ No newline at end of file
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Text, Boolean, Index
 from sqlalchemy.sql import func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from utils.database import Base
 import uuid
 
@@ -16,8 +16,50 @@ class EventModel(Base):
     max_participants = Column(Integer, nullable=False)
     current_participants = Column(Integer, default=0, nullable=False)
     location = Column(String, nullable=False)
+    # Resolved from location against the campus gazetteer; NULL when the place is unknown
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    # Byte-wise collation, so a geohash prefix is a contiguous index range
+    geohash = Column(String(12, collation="C"), nullable=True)
     event_date = Column(DateTime(timezone=True), nullable=False)
     image_url = Column(String, nullable=True)
+    image_variants = Column(JSONB, nullable=True)
     price = Column(Float, nullable=True)
     is_deleted = Column(Boolean, default=True, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Partial indexes backing the keyset-paginated listing, ordered by (event_date, id),
+    # and each of its server-side filters. Only live events are indexed.
+    __table_args__ = (
+        Index(
+            "ix_events_live_date_id",
+            "event_date", "id",
+            postgresql_where=(is_deleted == False),
+        ),
+        Index(
+            "ix_events_live_free_seats_date_id",
+            "event_date", "id",
+            postgresql_where=(is_deleted == False) & (current_participants < max_participants),
+        ),
+        Index(
+            "ix_events_live_price",
+            "price",
+            postgresql_where=(is_deleted == False),
+        ),
+        Index(
+            "ix_events_live_host_date_id",
+            "host_user_id", "event_date", "id",
+            postgresql_where=(is_deleted == False),
+        ),
+        Index(
+            "ix_events_live_meal_date_id",
+            "meal_id", "event_date", "id",
+            postgresql_where=(is_deleted == False),
+        ),
+        # Prefix range scans for the nearby-events query (see utils.geo)
+        Index(
+            "ix_events_live_geohash",
+            "geohash",
+            postgresql_where=(is_deleted == False) & (geohash != None),
+        ),
+    )
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Text, Index
+from sqlalchemy.sql import func
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from utils.database import Base
+
+
+class EventFeedModel(Base):
+    """Ready-to-serve event card: one row per live event, denormalized from events, meals and users
+
+    Maintained by services.feed_service from the event, meal and user write paths;
+    rebuild_event_feed.py recreates it from scratch.
+    """
+    __tablename__ = "event_feed"
+
+    event_id = Column(UUID(as_uuid=False), ForeignKey("events.id"), primary_key=True)
+    host_user_id = Column(UUID(as_uuid=False), nullable=False, index=True)
+    meal_id = Column(UUID(as_uuid=False), nullable=False, index=True)
+    title = Column(String, nullable=False)
+    description = Column(Text, nullable=False)
+    location = Column(String, nullable=False)
+    event_date = Column(DateTime(timezone=True), nullable=False)
+    price = Column(Float, nullable=True)
+    image_url = Column(String, nullable=True)
+    image_variants = Column(JSONB, nullable=True)
+    max_participants = Column(Integer, nullable=False)
+    current_participants = Column(Integer, nullable=False)
+    seats_left = Column(Integer, nullable=False)
+    # NULL once the meal is deleted
+    meal_title = Column(String, nullable=True)
+    host_name = Column(String, nullable=False)
+    host_profile_picture = Column(String, nullable=True)
+    host_profile_picture_variants = Column(JSONB, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    # The feed is read in (event_date, event_id) keyset order, optionally only events with seats left
+    __table_args__ = (
+        Index("ix_event_feed_date_id", "event_date", "event_id"),
+        Index("ix_event_feed_open_date_id", "event_date", "event_id", postgresql_where=(seats_left > 0)),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from utils.database import Base
@@ -11,4 +11,11 @@ class EventParticipantModel(Base):
     id = Column(UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
     event_id = Column(UUID(as_uuid=False), ForeignKey("events.id"), nullable=False, index=True)
     participant_id = Column(UUID(as_uuid=False), ForeignKey("users.id"), nullable=False, index=True)
-    joined_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
\ No newline at end of file
+    joined_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # A user can only hold one seat per event; join_event relies on this to reject duplicate joins atomically.
+    # (event_id, joined_at, id) backs the attendee list, paginated in join order.
+    __table_args__ = (
+        UniqueConstraint("event_id", "participant_id", name="uq_events_participants_event_participant"),
+        Index("ix_events_participants_event_joined_id", "event_id", "joined_at", "id"),
+    )
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from utils.database import Base
+import uuid
+
+
+class EventWaitlistModel(Base):
+    __tablename__ = "events_waitlist"
+
+    id = Column(UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
+    event_id = Column(UUID(as_uuid=False), ForeignKey("events.id"), nullable=False)
+    user_id = Column(UUID(as_uuid=False), ForeignKey("users.id"), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # One place per user and event; (event_id, created_at, id) is the FIFO order promotions take
+    __table_args__ = (
+        UniqueConstraint("event_id", "user_id", name="uq_events_waitlist_event_user"),
+        Index("ix_events_waitlist_event_created_id", "event_id", "created_at", "id"),
+    )
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from utils.database import Base
+import uuid
+
+
+class IngredientModel(Base):
+    __tablename__ = "ingredients"
+
+    id = Column(UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
+    # An index term of utils.ingredients (a whole ingredient or a run of its words), stored once
+    name = Column(String(100), unique=True, nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class MealIngredientModel(Base):
+    __tablename__ = "meals_ingredients"
+
+    id = Column(UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
+    meal_id = Column(UUID(as_uuid=False), ForeignKey("meals.id"), nullable=False, index=True)
+    ingredient_id = Column(UUID(as_uuid=False), ForeignKey("ingredients.id"), nullable=False)
+
+    # (ingredient_id, meal_id) is the inverted index: every meal containing an ingredient
+    __table_args__ = (
+        UniqueConstraint("meal_id", "ingredient_id", name="uq_meals_ingredients_meal_ingredient"),
+        Index("ix_meals_ingredients_ingredient_meal", "ingredient_id", "meal_id"),
+    )
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, Integer, DateTime, Text, Index
+from sqlalchemy.sql import func
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from utils.database import Base
+import uuid
+
+
+class JobModel(Base):
+    """A background job, run by worker.py (see services.job_service)"""
+    __tablename__ = "jobs"
+
+    id = Column(UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
+    job_type = Column(String(64), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    # pending -> running -> done, or back to pending with a later run_at, or dead after max_attempts
+    status = Column(String(16), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    run_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    locked_by = Column(String, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Claiming scans the due jobs of one type; running jobs are counted against the type's limit
+    __table_args__ = (
+        Index("ix_jobs_pending_type_run_at", "job_type", "run_at", postgresql_where=(status == "pending")),
+        Index("ix_jobs_running_type_locked_at", "job_type", "locked_at", postgresql_where=(status == "running")),
+        Index("ix_jobs_finished_at", "finished_at", postgresql_where=(status == "done")),
+    )
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Boolean, Computed, Index
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
 from utils.database import Base
 import uuid
 
@@ -14,5 +15,35 @@ class MealModel(Base):
     description = Column(Text, nullable=False)
     ingredients = Column(Text, nullable=False)
     image_url = Column(String(500), nullable=True)
+    image_variants = Column(JSONB, nullable=True)
     is_deleted = Column(Boolean, default=True, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Full-text document for meal discovery, maintained by Postgres. The 'simple' configuration
+    # does no stemming, so prefix queries match what is being typed in any language.
+    # Deferred: it is only ever used inside queries, never loaded into the model.
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(ingredients, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'C')",
+            persisted=True
+        ),
+        nullable=True
+    ))
+
+    # Only live meals are searched and listed
+    __table_args__ = (
+        Index(
+            "ix_meals_live_search",
+            "search_vector",
+            postgresql_using="gin",
+            postgresql_where=(is_deleted == False),
+        ),
+        Index(
+            "ix_meals_live_created_id",
+            "created_at", "id",
+            postgresql_where=(is_deleted == False),
+        ),
+    )
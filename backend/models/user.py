@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, DateTime, Text
+from sqlalchemy import Column, String, DateTime, Text, Index
 from sqlalchemy.sql import func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from utils.database import Base
 import uuid
 
@@ -15,4 +15,17 @@ class UserModel(Base):
     university = Column(String, nullable=True)
     description = Column(Text, nullable=True)
     profile_picture = Column(String, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
\ No newline at end of file
+    profile_picture_variants = Column(JSONB, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Trigram indexes (pg_trgm, created by init_db.py) behind the fuzzy user search:
+    # they serve both substring ILIKE and word-similarity matches on these columns
+    __table_args__ = (
+        Index("ix_users_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index(
+            "ix_users_university_trgm",
+            "university",
+            postgresql_using="gin",
+            postgresql_ops={"university": "gin_trgm_ops"},
+        ),
+    )
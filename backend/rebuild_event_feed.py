@@ -0,0 +1,27 @@
+"""
+Event feed rebuild
+Recreates the event_feed table from events, meals and users. Run it after creating
+the table on an existing database, or to recover from a feed that drifted.
+"""
+import asyncio
+
+from services.feed_service import rebuild_feed
+from utils.database import AsyncSessionLocal, async_engine
+from utils.response_cache import invalidate, FEED_TAG
+
+
+async def rebuild_event_feed():
+    """Rebuild the whole feed in one transaction"""
+    print("Rebuilding the event feed...")
+    try:
+        async with AsyncSessionLocal() as db:
+            rows = await rebuild_feed(db)
+            await db.commit()
+        await invalidate(FEED_TAG)
+    finally:
+        await async_engine.dispose()
+    print(f"Event feed rebuilt with {rows} events!")
+
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_event_feed())
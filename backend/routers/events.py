@@ -1,23 +1,32 @@
-from fastapi import APIRouter, Depends, File, UploadFile, Form
-from typing import List, Annotated, Optional
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile, Form, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Annotated, Optional, Union
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
+from datetime import datetime
 
-from schemas.event import Event, EventCreate, EventUpdate
-from schemas.event_participant import EventParticipant
+from schemas.batch import BatchResult
+from schemas.event import Event, EventCard, NearbyEvent, EventCreate, EventUpdate, EventFilters
+from schemas.event_participant import EventParticipant, ParticipantSummary
 from utils.auth import get_current_user_id
-from utils.database import get_db
-from services import event_service
+from utils.batch import parse_batch_ids
+from utils.database import AsyncSessionLocal, get_db, get_read_db
+from utils.live import LIVE_MAX_SUBSCRIBERS, event_stream, live_hub, read_event_snapshot
+from utils.pagination import set_next_cursor
+from utils.response_cache import CachedRoute, cache_response, EVENTS_TAG, FEED_TAG, event_tag, meal_tag
+from services import event_service, feed_service
 
-router = APIRouter(prefix="/events", tags=["events"])
+router = APIRouter(prefix="/events", tags=["events"], route_class=CachedRoute)
 
 class JoinEventRequest(BaseModel):
     event_id: str
+    # Wait for a seat instead of failing when the event is full
+    waitlist: bool = False
 
 @router.get("/me", response_model=List[Event], response_model_by_alias=True)
 async def get_my_events_endpoint(
     current_user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all events created by the authenticated user"""
     return await event_service.get_user_events(current_user_id, db)
@@ -25,7 +34,7 @@ async def get_my_events_endpoint(
 @router.get("/me/joined", response_model=List[Event], response_model_by_alias=True)
 async def get_my_joined_events_endpoint(
     current_user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all events that the authenticated user has joined"""
     return await event_service.get_user_joined_events(current_user_id, db)
@@ -39,7 +48,7 @@ async def create_event_endpoint(
     event_date: Annotated[str, Form()],
     meal_id: Annotated[str, Form()],
     current_user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     price: Annotated[Optional[str], Form()] = None,
     image: Annotated[Optional[UploadFile], File()] = None
 ):
@@ -69,42 +78,181 @@ async def create_event_endpoint(
 async def join_event_endpoint(
     join_request: JoinEventRequest,
     current_user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Join an existing event"""
+    """Join an existing event, or its waitlist when it is full and waitlist is set"""
     # Create the full request with authenticated user ID
     full_request = {
         "user_id": current_user_id,
-        "event_id": join_request.event_id
+        "event_id": join_request.event_id,
+        "waitlist": join_request.waitlist
     }
     return await event_service.join_event(full_request, db)
 
+@router.post("/{event_id}/leave")
+async def leave_event_endpoint(
+    event_id: str,
+    current_user_id: Annotated[str, Depends(get_current_user_id)],
+    db: AsyncSession = Depends(get_db)
+):
+    """Leave an event (or its waitlist); a freed seat goes to the next waitlisted user"""
+    return await event_service.leave_event(event_id, current_user_id, db)
+
 @router.get("/", response_model=List[Event], response_model_by_alias=True)
+@cache_response(lambda path_params, payload: [EVENTS_TAG])
 async def list_events_endpoint(
+    response: Response,
     user_id: Optional[str] = None,
-    db: Session = Depends(get_db)
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    max_price: Optional[float] = None,
+    has_free_seats: bool = False,
+    host_user_id: Optional[str] = None,
+    meal_id: Optional[str] = None,
+    include_ingredients: Annotated[Optional[List[str]], Query()] = None,
+    exclude_ingredients: Annotated[Optional[List[str]], Query()] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 50,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """List all events, optionally filtered by user_id (for public profiles)"""
+    """List events page by page, optionally filtered by user_id (for public profiles)
+
+    Events are ordered by date. When more events are available, the cursor of
+    the next page is returned in the X-Next-Cursor response header.
+    """
     if user_id:
         return await event_service.get_user_events(user_id, db)
-    return await event_service.list_events(db)
+
+    filters = EventFilters(
+        date_from=date_from,
+        date_to=date_to,
+        max_price=max_price,
+        has_free_seats=has_free_seats,
+        host_user_id=host_user_id,
+        meal_id=meal_id,
+        include_ingredients=include_ingredients or [],
+        exclude_ingredients=exclude_ingredients or []
+    )
+    events, next_cursor = await event_service.list_events(db, filters, limit, cursor)
+    set_next_cursor(response, next_cursor)
+    return events
+
+@router.get("/feed", response_model=List[EventCard], response_model_by_alias=True)
+@cache_response(lambda path_params, payload: [EVENTS_TAG, FEED_TAG])
+async def get_event_feed_endpoint(
+    response: Response,
+    date_from: Optional[datetime] = None,
+    has_free_seats: bool = False,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List ready-to-render event cards (meal title, host, seats left) page by page
+
+    Cards are ordered by event date. When more cards are available, the cursor
+    of the next page is returned in the X-Next-Cursor response header.
+    """
+    cards, next_cursor = await feed_service.list_feed(db, limit, cursor, date_from, has_free_seats)
+    set_next_cursor(response, next_cursor)
+    return cards
+
+@router.get("/nearby", response_model=List[NearbyEvent], response_model_by_alias=True)
+@cache_response(lambda path_params, payload: [EVENTS_TAG])
+async def get_nearby_events_endpoint(
+    latitude: Annotated[float, Query(ge=-90, le=90)],
+    longitude: Annotated[float, Query(ge=-180, le=180)],
+    radius_km: Annotated[float, Query(gt=0, le=50)] = 1,
+    date_from: Optional[datetime] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List events within radius_km of a point, nearest first
+
+    Only events whose location is a known campus place have coordinates.
+    """
+    return await event_service.list_nearby_events(db, latitude, longitude, radius_km, limit, date_from)
+
+def _live_response(stream) -> StreamingResponse:
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        # Proxies must pass messages through as they are written
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _check_live_capacity() -> None:
+    if live_hub.subscriber_count >= LIVE_MAX_SUBSCRIBERS:
+        raise HTTPException(status_code=503, detail="Too many live subscribers, please poll instead")
+
+@router.get("/live")
+async def live_events_endpoint(request: Request):
+    """Server-Sent Events stream of seat counts, updates and deletions of every event"""
+    _check_live_capacity()
+    return _live_response(event_stream(request))
+
+@router.get("/batch", response_model=BatchResult[Event], response_model_by_alias=True)
+async def get_events_batch_endpoint(
+    ids: Annotated[Optional[List[str]], Query()] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get up to 200 events by ID in one request (ids repeated or comma-separated)
+
+    Events come back in request order; IDs without a live event are listed in missing.
+    """
+    events, missing = await event_service.get_events_by_ids(parse_batch_ids(ids), db)
+    return BatchResult[Event](items=events, missing=missing)
 
 @router.get("/{event_id}", response_model=Event, response_model_by_alias=True)
-async def get_event_details_endpoint(event_id: str, db: Session = Depends(get_db)):
+@cache_response(lambda path_params, payload: [event_tag(path_params["event_id"])] + (
+    [meal_tag(payload["mealId"])] if payload else []
+))
+async def get_event_details_endpoint(event_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get details of a specific event"""
     return await event_service.get_event_details(event_id, db)
 
-@router.get("/{event_id}/participants", response_model=List[EventParticipant])
-async def get_event_participants_endpoint(event_id: str, db: Session = Depends(get_db)):
-    """Get all participants for a specific event"""
-    return await event_service.get_event_participants(event_id, db)
+@router.get("/{event_id}/participants", response_model=Union[List[ParticipantSummary], List[EventParticipant]])
+async def get_event_participants_endpoint(
+    event_id: str,
+    response: Response,
+    expand: bool = False,
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get all participants for a specific event
+
+    With expand=true, participants come back as user summaries (id, name,
+    profile picture, joined_at) in join order, page by page; the cursor of the
+    next page is returned in the X-Next-Cursor response header.
+    """
+    if not expand:
+        return await event_service.get_event_participants(event_id, db)
+
+    participants, next_cursor = await event_service.get_event_participant_summaries(event_id, db, limit, cursor)
+    set_next_cursor(response, next_cursor)
+    return participants
+
+@router.get("/{event_id}/live")
+async def live_event_endpoint(event_id: str, request: Request):
+    """Server-Sent Events stream of one event: its current state, then every change until it is deleted"""
+    _check_live_capacity()
+    # Short-lived sessions rather than get_db, which would hold a pooled
+    # connection for as long as the stream stays open
+    async with AsyncSessionLocal() as db:
+        await event_service.get_event_details(event_id, db)
+
+    async def load_snapshot():
+        async with AsyncSessionLocal() as db:
+            return await read_event_snapshot(event_id, db)
+
+    return _live_response(event_stream(request, event_id, load_snapshot))
 
 @router.put("/{event_id}", response_model=Event, response_model_by_alias=True)
 async def update_event_endpoint(
     event_id: str,
     event_update: EventUpdate,
     current_user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update an existing event (only the host can update)"""
     return await event_service.update_event(event_id, event_update, current_user_id, db)
@@ -113,7 +261,7 @@ async def update_event_endpoint(
 async def delete_event_endpoint(
     event_id: str,
     current_user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Soft delete an event (only the host can delete)"""
     return await event_service.soft_delete_event(event_id, current_user_id, db)
\ No newline at end of file
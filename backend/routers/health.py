@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from utils.auth import get_auth_cache_stats
+from utils.database import get_db, get_pool_stats, get_replica_stats
+from utils.images import image_pool
+from utils.live import live_hub
+from utils.password import password_pool
+from utils.response_cache import get_response_cache_stats
+from services.job_service import get_job_stats
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+@router.get("/password-pool")
+async def password_pool_stats_endpoint():
+    """Queue depth, worker usage and wait times of the password hashing pool"""
+    return password_pool.stats()
+
+@router.get("/image-pool")
+async def image_pool_stats_endpoint():
+    """Queue depth, worker usage and wait times of the image variant pool"""
+    return image_pool.stats()
+
+@router.get("/db")
+async def db_pool_stats_endpoint():
+    """Checked-out and idle connections and wait times of the database pool"""
+    return get_pool_stats()
+
+@router.get("/db-replica")
+async def db_replica_stats_endpoint():
+    """Replication lag and how read-only requests were split between replica and primary"""
+    return get_replica_stats()
+
+@router.get("/auth-cache")
+async def auth_cache_stats_endpoint():
+    """Hit rate of the verified-token cache"""
+    return get_auth_cache_stats()
+
+@router.get("/response-cache")
+async def response_cache_stats_endpoint():
+    """Backend, size and hit rate of the public response cache"""
+    return get_response_cache_stats()
+
+
+@router.get("/live")
+async def live_hub_stats_endpoint():
+    """Listener state, subscribers and delivered/dropped messages of the live updates hub"""
+    return live_hub.stats()
+
+
+@router.get("/jobs")
+async def job_stats_endpoint(db: AsyncSession = Depends(get_db)):
+    """Background jobs by type and status (pending, running, done, dead)"""
+    return await get_job_stats(db)
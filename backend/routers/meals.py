@@ -1,18 +1,22 @@
-from fastapi import APIRouter, Depends, File, UploadFile, Form
+from fastapi import APIRouter, Depends, File, UploadFile, Form, Query, Response
 from typing import List, Annotated, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from schemas.batch import BatchResult
 from schemas.meal import Meal, MealUpdate
 from utils.auth import get_current_user_id
-from utils.database import get_db
+from utils.batch import parse_batch_ids
+from utils.database import get_db, get_read_db
+from utils.pagination import set_next_cursor
+from utils.response_cache import CachedRoute, cache_response, meal_tag
 from services import meal_service
 
-router = APIRouter(prefix="/meals", tags=["meals"])
+router = APIRouter(prefix="/meals", tags=["meals"], route_class=CachedRoute)
 
 @router.get("/me", response_model=List[Meal], response_model_by_alias=True)
 async def get_my_meals_endpoint(
     current_user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all meals created by the authenticated user"""
     return await meal_service.get_user_meals(current_user_id, db)
@@ -23,7 +27,7 @@ async def create_meal_endpoint(
     description: Annotated[str, Form()],
     ingredients: Annotated[str, Form()],
     current_user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     image: Annotated[Optional[UploadFile], File()] = None
 ):
     """Create a new meal with optional image upload"""
@@ -39,20 +43,48 @@ async def create_meal_endpoint(
 
 @router.get("/", response_model=List[Meal], response_model_by_alias=True)
 async def list_meals_endpoint(
+    response: Response,
     user_id: Optional[str] = None,
-    db: Session = Depends(get_db)
+    query: Optional[str] = None,
+    include_ingredients: Annotated[Optional[List[str]], Query()] = None,
+    exclude_ingredients: Annotated[Optional[List[str]], Query()] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """List all meals, optionally filtered by user_id"""
+    """Discover meals page by page, optionally searching them, or list a user's meals
+
+    With query, meals are full-text searched (words match as prefixes) and ranked;
+    otherwise the newest come first. include_ingredients / exclude_ingredients keep
+    meals containing all / none of the given ingredients. When more meals are
+    available, the cursor of the next page is returned in the X-Next-Cursor header.
+    """
     if user_id:
         return await meal_service.get_user_meals(user_id, db)
-    # If you have a list_all_meals service method, use it here
-    # For now, returning empty list or you can implement list_all
-    return []
+
+    meals, next_cursor = await meal_service.list_meals(
+        db, query, limit, cursor, include_ingredients, exclude_ingredients
+    )
+    set_next_cursor(response, next_cursor)
+    return meals
+
+@router.get("/batch", response_model=BatchResult[Meal], response_model_by_alias=True)
+async def get_meals_batch_endpoint(
+    ids: Annotated[Optional[List[str]], Query()] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get up to 200 meals by ID in one request (ids repeated or comma-separated)
+
+    Meals come back in request order; IDs without a live meal are listed in missing.
+    """
+    meals, missing = await meal_service.get_meals_by_ids(parse_batch_ids(ids), db)
+    return BatchResult[Meal](items=meals, missing=missing)
 
 @router.get("/{meal_id}", response_model=Meal, response_model_by_alias=True)
+@cache_response(lambda path_params, payload: [meal_tag(path_params["meal_id"])])
 async def get_meal_endpoint(
     meal_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get details of a specific meal"""
     return await meal_service.get_meal(meal_id, db)
@@ -63,7 +95,7 @@ async def update_meal_endpoint(
     meal_id: str,
     meal_update: MealUpdate,
     current_user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update an existing meal (only the creator can update)"""
     return await meal_service.update_meal(meal_id, meal_update, current_user_id, db)
@@ -73,7 +105,7 @@ async def update_meal_endpoint(
 async def delete_meal_endpoint(
     meal_id: str,
     current_user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Soft delete a meal (only the creator can delete)"""
     return await meal_service.soft_delete_meal(meal_id, current_user_id, db)
\ No newline at end of file
@@ -1,21 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile
-from typing import List, Annotated
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Query, Response
+from typing import List, Annotated, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from schemas.batch import BatchResult
 from schemas.user import User, UserCreate, UserLogin, UserUpdate, LoginResponse
 from utils.auth import get_current_user_id
-from utils.database import get_db
+from utils.batch import parse_batch_ids
+from utils.database import get_db, get_read_db
+from utils.pagination import set_next_cursor
+from utils.response_cache import CachedRoute, cache_response, user_tag
 from services import user_service
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=CachedRoute)
 
 @router.post("/", response_model=User)
-async def create_user_endpoint(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user_endpoint(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """Create a new user"""
     return await user_service.create_user(user, db)
 
 @router.post("/login", response_model=LoginResponse)
-async def login_endpoint(login_data: UserLogin, db: Session = Depends(get_db)):
+async def login_endpoint(login_data: UserLogin, db: AsyncSession = Depends(get_db)):
     """Authenticate user and return JWT token"""
     return await user_service.authenticate_user(login_data, db)
 
@@ -25,17 +29,42 @@ async def test_endpoint():
     return {"message": "Users router is working"}
 
 @router.get("/search", response_model=List[User])
-async def search_users_endpoint(query: str, limit: int = 10, db: Session = Depends(get_db)):
-    """Search users by name"""
-    return await user_service.search_users(query, db, limit)
+async def search_users_endpoint(
+    query: str,
+    response: Response,
+    university: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=50)] = 10,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Search users by name, best matches first, optionally within a university
+
+    When more matches are available, the cursor of the next page is returned
+    in the X-Next-Cursor response header.
+    """
+    users, next_cursor = await user_service.search_users(query, db, limit, university, cursor)
+    set_next_cursor(response, next_cursor)
+    return users
 
 # More specific routes should come BEFORE generic ones to avoid routing conflicts
+@router.get("/batch", response_model=BatchResult[User])
+async def get_users_batch_endpoint(
+    ids: Annotated[Optional[List[str]], Query()] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get up to 200 users by ID in one request (ids repeated or comma-separated)
+
+    Users come back in request order; IDs without a user are listed in missing.
+    """
+    users, missing = await user_service.get_users_by_ids(parse_batch_ids(ids), db)
+    return BatchResult[User](items=users, missing=missing)
+
 @router.post("/{user_id}/profile-picture", response_model=User)
 async def upload_profile_picture_endpoint(
     user_id: str,
     image: Annotated[UploadFile, File()],
     current_user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Upload a profile picture for the user (only the authenticated user can upload their own picture)"""
     if current_user_id != user_id:
@@ -48,7 +77,7 @@ async def update_user_profile_endpoint(
     user_id: str,
     user_update: UserUpdate,
     current_user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update user profile (only the authenticated user can update their own profile)"""
     if current_user_id != user_id:
@@ -58,11 +87,10 @@ async def update_user_profile_endpoint(
 
 # Generic route last
 @router.get("/{user_id}", response_model=User)
-async def get_user_by_id_endpoint(user_id: str, db: Session = Depends(get_db)):
+@cache_response(lambda path_params, payload: [user_tag(path_params["user_id"])])
+async def get_user_by_id_endpoint(user_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get user by ID"""
-    print(f"GET /users/{user_id} called")
     user = await user_service.get_user(user_id, db)
-    print(f"User found: {user is not None}")
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
\ No newline at end of file
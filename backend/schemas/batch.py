@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Generic, List, TypeVar
+
+T = TypeVar("T")
+
+
+class BatchResult(BaseModel, Generic[T]):
+    """Items found by a batch lookup, in request order, and the requested IDs that were not found"""
+    items: List[T]
+    missing: List[str]
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, ConfigDict
 from pydantic.alias_generators import to_camel
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
 class EventBase(BaseModel):
     meal_id: str
@@ -30,10 +30,58 @@ class Event(EventBase):
     event_date: datetime  # Store as datetime
     created_at: datetime
     image_url: Optional[str] = None
+    # Resized WebP copies of image_url keyed by size: thumbnail, card, full
+    image_variants: Optional[Dict[str, str]] = None
+    # Coordinates of location, when it is a known campus place
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
     model_config = ConfigDict(
         from_attributes=True,
         alias_generator=to_camel,
         populate_by_name=True,
         by_alias=True
-    )
\ No newline at end of file
+    )
+
+class NearbyEvent(Event):
+    distance_km: float
+
+class EventFilters(BaseModel):
+    """Server-side filters for event listings"""
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    max_price: Optional[float] = None
+    has_free_seats: bool = False
+    host_user_id: Optional[str] = None
+    meal_id: Optional[str] = None
+    # Ingredients the event's meal must contain all of / none of
+    include_ingredients: List[str] = []
+    exclude_ingredients: List[str] = []
+
+class EventCard(BaseModel):
+    """Everything an event card shows, served from the event feed in one read"""
+    id: str
+    host_user_id: str
+    meal_id: str
+    title: str
+    description: str
+    location: str
+    event_date: datetime
+    price: Optional[float] = None
+    image_url: Optional[str] = None
+    image_variants: Optional[Dict[str, str]] = None
+    max_participants: int
+    current_participants: int
+    seats_left: int
+    meal_name: str
+    host_name: str
+    host_profile_picture: Optional[str] = None
+    host_profile_picture_variants: Optional[Dict[str, str]] = None
+    created_at: datetime
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        alias_generator=to_camel,
+        populate_by_name=True,
+        by_alias=True
+    )
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, ConfigDict
 from datetime import datetime
+from typing import Optional
 
 class EventParticipantBase(BaseModel):
     event_id: str
@@ -15,3 +16,13 @@ class EventParticipant(EventParticipantBase):
     model_config = ConfigDict(from_attributes=True, json_encoders={
             datetime: lambda v: v.isoformat()
         })
+
+
+class ParticipantSummary(BaseModel):
+    """A participant as shown in an event's attendee list"""
+    id: str
+    name: str
+    profile_picture: Optional[str] = None
+    joined_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, ConfigDict
 from pydantic.alias_generators import to_camel
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 
 
 class MealBase(BaseModel):
@@ -27,6 +27,8 @@ class Meal(MealBase):
     id: str
     user_id: str
     image_url: Optional[str] = None
+    # Resized WebP copies of image_url keyed by size: thumbnail, card, full
+    image_variants: Optional[Dict[str, str]] = None
     created_at: datetime
 
     model_config = ConfigDict(
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from typing import Dict, Optional
 from datetime import datetime
 
 # Pydantic models
@@ -24,6 +24,8 @@ class UserUpdate(BaseModel):
 
 class User(UserBase):
     id: str
+    # Resized WebP copies of profile_picture keyed by size: thumbnail, card, full
+    profile_picture_variants: Optional[Dict[str, str]] = None
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
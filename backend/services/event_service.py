@@ -1,86 +1,115 @@
 from fastapi import HTTPException, UploadFile
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
+from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy import and_, delete, exists, func, or_, insert, literal, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 import uuid
 
 from models.event import EventModel
 from models.event_participant import EventParticipantModel
-from schemas.event import Event, EventCreate, EventUpdate
-from schemas.event_participant import EventParticipant
+from models.event_waitlist import EventWaitlistModel
+from models.meal import MealModel
+from models.user import UserModel
+from schemas.event import Event, EventCreate, EventUpdate, EventFilters, NearbyEvent
+from schemas.event_participant import EventParticipant, ParticipantSummary
 from utils.converters import (
     event_model_to_schema,
+    event_rows_to_schemas,
     event_participant_models_to_schemas
 )
-from utils.supabase import supabase
+from utils.batch import split_valid_ids, order_batch
+from utils.database import AsyncSessionLocal
+from utils.gazetteer import resolve_location
+from utils.geo import EARTH_RADIUS_KM, covering_cells, encode_geohash
+from utils.pagination import encode_cursor, decode_cursor, split_page
+from utils.live import publish_event_change, SEATS, UPDATED, DELETED
+from utils.logger import get_logger
+from utils.response_cache import invalidate, EVENTS_TAG, event_tag
+from utils.uploads import upload_image
 from .user_service import get_user
 from .meal_service import get_meal_name
+from .ingredient_service import ingredient_filter
+from .feed_service import refresh_event_card, refresh_event_seats
+from .job_handlers import PROMOTE_WAITLIST_JOB
+from .job_service import enqueue_job
 
+logger = get_logger(__name__)
 
-def get_event(event_id: str, db: Session) -> Optional[Event]:
+
+def select_events_with_meal_name():
+    """Build a statement returning (EventModel, meal title) rows in a single round-trip.
+
+    The meal title is resolved with an outer join so events whose meal was
+    deleted still come back, with a NULL title.
+    """
+    return select(EventModel, MealModel.title).outerjoin(
+        MealModel,
+        and_(MealModel.id == EventModel.meal_id, MealModel.is_deleted == False)
+    )
+
+
+def locate_event(event_model: EventModel) -> None:
+    """Set the coordinates and geohash of an event from its location, or clear them for unknown places"""
+    coordinates = resolve_location(event_model.location)
+    if coordinates:
+        event_model.latitude, event_model.longitude = coordinates
+        event_model.geohash = encode_geohash(*coordinates)
+    else:
+        event_model.latitude = event_model.longitude = event_model.geohash = None
+
+
+async def get_event(event_id: str, db: AsyncSession) -> Optional[Event]:
     """Get event by ID from database"""
     try:
-        event_model = db.query(EventModel).filter(
-            EventModel.id == event_id,
-            EventModel.is_deleted == False
-        ).first()
-        if event_model:
-            meal_name = get_meal_name(event_model.meal_id, db)
+        row = (await db.execute(
+            select_events_with_meal_name().where(
+                EventModel.id == event_id,
+                EventModel.is_deleted == False
+            )
+        )).first()
+        if row:
+            event_model, meal_name = row
             return event_model_to_schema(event_model, meal_name)
         return None
-    except Exception as e:
-        print(f"Error getting event: {e}")
+    except Exception:
+        logger.exception("Error getting event", extra={"event_id": event_id})
         return None
 
 
-def is_user_participating(event_id: str, user_id: str, db: Session) -> bool:
+async def is_user_participating(event_id: str, user_id: str, db: AsyncSession) -> bool:
     """Check if user is already participating in an event"""
     try:
-        participant = db.query(EventParticipantModel).filter(
-            EventParticipantModel.event_id == event_id,
-            EventParticipantModel.participant_id == user_id
-        ).first()
-        return participant is not None
-    except Exception as e:
-        print(f"Error checking participation: {e}")
+        participant_id = await db.scalar(
+            select(EventParticipantModel.id).where(
+                EventParticipantModel.event_id == event_id,
+                EventParticipantModel.participant_id == user_id
+            )
+        )
+        return participant_id is not None
+    except Exception:
+        logger.exception("Error checking participation", extra={"event_id": event_id, "user_id": user_id})
         return False
 
 
-async def upload_event_image(image: UploadFile) -> str:
-    """Upload an event image to Supabase Storage and return the public URL"""
+async def upload_event_image(image: UploadFile) -> Tuple[str, Dict[str, str]]:
+    """Upload an event image to storage and return the public URLs of it and its variants"""
     try:
-        # Validate file type
-        allowed_types = ["image/jpeg", "image/jpg", "image/png", "image/webp"]
-        if image.content_type not in allowed_types:
-            raise HTTPException(status_code=400, detail="Invalid file type. Only JPEG, PNG, and WebP images are allowed.")
-
-        # Validate file size (5MB max)
-        contents = await image.read()
-        if len(contents) > 5 * 1024 * 1024:  # 5MB in bytes
-            raise HTTPException(status_code=400, detail="File size exceeds 5MB limit.")
-
-        # Generate unique filename
-        file_extension = image.filename.split('.')[-1] if image.filename else 'jpg'
-        unique_filename = f"{uuid.uuid4()}_{int(datetime.now().timestamp())}.{file_extension}"
-
-        # Upload to Supabase Storage
-        result = supabase.storage.from_("event-images").upload(
-            unique_filename,
-            contents,
-            {"content-type": image.content_type}
+        return await upload_image(
+            image,
+            bucket="event-images",
+            allowed_types=["image/jpeg", "image/jpg", "image/png", "image/webp"],
+            invalid_type_detail="Invalid file type. Only JPEG, PNG, and WebP images are allowed.",
+            too_large_detail="File size exceeds 5MB limit."
         )
-
-        # Get public URL
-        public_url = supabase.storage.from_("event-images").get_public_url(unique_filename)
-
-        return public_url
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error uploading image: {str(e)}")
 
 
-async def create_event(event: EventCreate, host_user_id: str, db: Session, image: Optional[UploadFile] = None) -> Event:
+async def create_event(event: EventCreate, host_user_id: str, db: AsyncSession, image: Optional[UploadFile] = None) -> Event:
     """Create a new culinary event with optional image upload"""
     # Verify host user exists
     host = await get_user(host_user_id, db)
@@ -90,8 +119,9 @@ async def create_event(event: EventCreate, host_user_id: str, db: Session, image
     try:
         # Upload image if provided
         image_url = None
+        image_variants = None
         if image and image.filename:
-            image_url = await upload_event_image(image)
+            image_url, image_variants = await upload_event_image(image)
 
         # Convert string event_date to datetime if needed
         event_date = event.event_date
@@ -110,158 +140,564 @@ async def create_event(event: EventCreate, host_user_id: str, db: Session, image
             location=event.location,
             event_date=event_date,
             image_url=image_url,
+            image_variants=image_variants,
             price=event.price,
             is_deleted=False,
         )
+        locate_event(event_model)
 
         db.add(event_model)
-        db.commit()
-        db.refresh(event_model)
+        await db.flush()
+        await refresh_event_card(event_model.id, db)
+        await db.commit()
+        await invalidate(EVENTS_TAG)
+        await db.refresh(event_model)
 
-        meal_name = get_meal_name(event_model.meal_id, db)
+        meal_name = await get_meal_name(event_model.meal_id, db)
         return event_model_to_schema(event_model, meal_name)
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=f"Error creating event: {str(e)}")
 
 
-async def join_event(join_request: Dict[str, Any], db: Session) -> Dict[str, str]:
-    """Join an existing event"""
-    user_id = join_request["user_id"] if isinstance(join_request, dict) else join_request.user_id
-    event_id = join_request["event_id"] if isinstance(join_request, dict) else join_request.event_id
+def build_join_statement(event_id: str, user_id: str, respect_waitlist: bool = True):
+    """Build the single statement that takes a free seat and records the participant
+
+    The capacity check and the increment happen in one conditional UPDATE, so
+    concurrent joins cannot overbook. When the UPDATE matches no row (event
+    missing, deleted, full, or joined by its host), nothing is inserted and the
+    statement returns no row. A second join by the same user violates the unique
+    (event_id, participant_id) constraint and rolls back the whole statement.
+
+    With respect_waitlist, free seats belong to the event's waitlist while anyone
+    else is on it, so a direct join cannot overtake the queue; promote_from_waitlist
+    builds it without. A successful join also removes the user's own waitlist place.
+    """
+    conditions = [
+        EventModel.id == event_id,
+        EventModel.is_deleted == False,
+        EventModel.host_user_id != user_id,
+        EventModel.current_participants < EventModel.max_participants
+    ]
+    if respect_waitlist:
+        conditions.append(~exists().where(
+            EventWaitlistModel.event_id == event_id,
+            EventWaitlistModel.user_id != user_id
+        ))
+    seat = (
+        update(EventModel)
+        .where(*conditions)
+        .values(current_participants=EventModel.current_participants + 1)
+        .returning(EventModel.id)
+        .cte("seat")
+    )
+    dequeued = (
+        delete(EventWaitlistModel)
+        .where(
+            EventWaitlistModel.event_id.in_(select(seat.c.id)),
+            EventWaitlistModel.user_id == user_id
+        )
+        .returning(EventWaitlistModel.id)
+        .cte("dequeued")
+    )
+    return (
+        insert(EventParticipantModel)
+        .from_select(
+            ["id", "event_id", "participant_id"],
+            select(
+                literal(str(uuid.uuid4()), EventParticipantModel.id.type),
+                seat.c.id,
+                literal(user_id, EventParticipantModel.participant_id.type)
+            )
+        )
+        .add_cte(dequeued)
+        .returning(EventParticipantModel.id)
+    )
 
-    # Verify user exists
-    user = await get_user(user_id, db)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
 
-    # Verify event exists
-    event = get_event(event_id, db)
-    if not event:
+async def raise_join_failure(event_id: str, user_id: str, db: AsyncSession) -> None:
+    """Explain why a join statement did not take a seat (only runs on the failure path)"""
+    event_model = await db.scalar(
+        select(EventModel).where(EventModel.id == event_id, EventModel.is_deleted == False)
+    )
+    if not event_model:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    # Check if user is already the host
-    if event.host_user_id == str(user_id):
+    if event_model.host_user_id == str(user_id):
         raise HTTPException(status_code=400, detail="Host cannot join their own event")
 
-    # Check if user is already participating
-    if is_user_participating(event_id, user_id, db):
+    if await is_user_participating(event_id, user_id, db):
         raise HTTPException(status_code=400, detail="User is already participating in this event")
 
-    # Check if event is full
-    if event.current_participants >= event.max_participants:
+    if event_model.current_participants >= event_model.max_participants:
         raise HTTPException(status_code=400, detail="Event is full")
 
-    try:
-        # Add participant to events_participants table
-        participant_model = EventParticipantModel(
-            id=str(uuid.uuid4()),
-            event_id=event_id,
-            participant_id=user_id
-        )
+    # Free seats are held for the people already waiting
+    others_waiting = await db.scalar(
+        select(exists().where(EventWaitlistModel.event_id == event_id, EventWaitlistModel.user_id != user_id))
+    )
+    if others_waiting:
+        raise HTTPException(status_code=400, detail="Event is full")
+
+    if not await get_user(user_id, db):
+        raise HTTPException(status_code=404, detail="User not found")
+
+    raise HTTPException(status_code=409, detail="Could not join the event, please try again")
+
+
+async def join_event(join_request: Dict[str, Any], db: AsyncSession) -> Dict[str, Any]:
+    """Join an existing event with a single atomic statement
+
+    With waitlist set, a full event puts the user on its waitlist instead of
+    failing; the response then carries waitlisted and waitlist_position.
+    """
+    user_id = join_request["user_id"] if isinstance(join_request, dict) else join_request.user_id
+    event_id = join_request["event_id"] if isinstance(join_request, dict) else join_request.event_id
+    waitlist = join_request.get("waitlist", False) if isinstance(join_request, dict) else join_request.waitlist
 
-        db.add(participant_model)
+    valid_ids, _ = split_valid_ids([event_id])
+    if not valid_ids:
+        raise HTTPException(status_code=404, detail="Event not found")
 
-        # Update event participants count
-        event_model = db.query(EventModel).filter(EventModel.id == event_id).first()
-        if event_model:
-            event_model.current_participants += 1
-            db.commit()
+    try:
+        participant_id = await db.scalar(build_join_statement(event_id, user_id))
+        if participant_id:
+            await refresh_event_seats(event_id, db)
+            await publish_event_change(event_id, SEATS, db)
+            await db.commit()
+            await invalidate(EVENTS_TAG, event_tag(event_id))
             return {"message": "Successfully joined the event", "event_id": event_id}
-        else:
-            db.rollback()
-            raise HTTPException(status_code=400, detail="Failed to update participant count")
-    except HTTPException:
-        raise
+        await db.rollback()
+    except IntegrityError:
+        # Duplicate participation or unknown user; diagnosed below
+        await db.rollback()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=f"Error joining event: {str(e)}")
 
+    try:
+        await raise_join_failure(event_id, user_id, db)
+    except HTTPException as failure:
+        if not (waitlist and failure.detail == "Event is full"):
+            raise
+    return await join_waitlist(event_id, user_id, db)
+
+
+async def join_waitlist(event_id: str, user_id: str, db: AsyncSession) -> Dict[str, Any]:
+    """Put a user at the end of a full event's waitlist (joining twice keeps the original place)
 
-async def list_events(db: Session) -> List[Event]:
-    """List all available events (excluding deleted ones)"""
+    A promotion job is enqueued with the waitlist place, in case a seat was
+    freed between the failed join and the insert.
+    """
+    if not await get_user(user_id, db):
+        raise HTTPException(status_code=404, detail="User not found")
     try:
-        event_models = db.query(EventModel).filter(EventModel.is_deleted == False).all()
-        # Convert each event with its meal name
-        events = []
-        for event_model in event_models:
-            meal_name = get_meal_name(event_model.meal_id, db)
-            events.append(event_model_to_schema(event_model, meal_name))
-        return events
+        await db.execute(
+            pg_insert(EventWaitlistModel)
+            .values(id=str(uuid.uuid4()), event_id=event_id, user_id=user_id)
+            .on_conflict_do_nothing(index_elements=[EventWaitlistModel.event_id, EventWaitlistModel.user_id])
+        )
+        await enqueue_job(PROMOTE_WAITLIST_JOB, {"event_id": event_id}, db)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=f"Error joining the waitlist: {str(e)}")
+
+    return {
+        "message": "Event is full, added to the waitlist",
+        "event_id": event_id,
+        "waitlisted": True,
+        "waitlist_position": await get_waitlist_position(event_id, user_id, db),
+    }
+
+
+async def get_waitlist_position(event_id: str, user_id: str, db: AsyncSession) -> Optional[int]:
+    """1-based place of a user in an event's waitlist, or None if not waiting"""
+    entry = (await db.execute(
+        select(EventWaitlistModel.created_at, EventWaitlistModel.id).where(
+            EventWaitlistModel.event_id == event_id,
+            EventWaitlistModel.user_id == user_id
+        )
+    )).first()
+    if entry is None:
+        return None
+    ahead = await db.scalar(
+        select(func.count()).select_from(EventWaitlistModel).where(
+            EventWaitlistModel.event_id == event_id,
+            tuple_(EventWaitlistModel.created_at, EventWaitlistModel.id) < tuple_(
+                literal(entry.created_at, EventWaitlistModel.created_at.type),
+                literal(entry.id, EventWaitlistModel.id.type)
+            )
+        )
+    )
+    return ahead + 1
+
+
+def build_leave_statement(event_id: str, user_id: str):
+    """Build the single statement that removes a participant and frees their seat
+
+    Returns the event ID when a seat was freed, and no row otherwise (not a
+    participant, or the event is missing or deleted, in which case nothing changes).
+    """
+    left = (
+        delete(EventParticipantModel)
+        .where(
+            EventParticipantModel.event_id == event_id,
+            EventParticipantModel.participant_id == user_id,
+            EventParticipantModel.event_id.in_(
+                select(EventModel.id).where(EventModel.id == event_id, EventModel.is_deleted == False)
+            )
+        )
+        .returning(EventParticipantModel.event_id)
+        .cte("left_seat")
+    )
+    return (
+        update(EventModel)
+        .where(EventModel.id.in_(select(left.c.event_id)))
+        .values(current_participants=EventModel.current_participants - 1)
+        .returning(EventModel.id)
+    )
+
+
+async def leave_event(event_id: str, user_id: str, db: AsyncSession) -> Dict[str, Any]:
+    """Give up a seat (or a waitlist place) in an event
+
+    A freed seat goes to the waitlist: the promotion job is enqueued in the
+    same transaction, so it runs even if this process stops right after.
+    """
+    try:
+        freed = await db.scalar(build_leave_statement(event_id, user_id))
+        if freed:
+            await refresh_event_seats(event_id, db)
+            await publish_event_change(event_id, SEATS, db)
+            await enqueue_job(PROMOTE_WAITLIST_JOB, {"event_id": event_id}, db)
+            await db.commit()
+            await invalidate(EVENTS_TAG, event_tag(event_id))
+            return {"message": "Successfully left the event", "event_id": event_id, "seat_freed": True}
+
+        left_waitlist = await db.scalar(
+            delete(EventWaitlistModel)
+            .where(EventWaitlistModel.event_id == event_id, EventWaitlistModel.user_id == user_id)
+            .returning(EventWaitlistModel.id)
+        )
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=f"Error leaving event: {str(e)}")
+
+    if left_waitlist:
+        return {"message": "Successfully left the waitlist", "event_id": event_id, "seat_freed": False}
+    if not await get_event(event_id, db):
+        raise HTTPException(status_code=404, detail="Event not found")
+    raise HTTPException(status_code=400, detail="User is not participating in this event")
+
+
+async def promote_from_waitlist(event_id: str) -> int:
+    """Move waitlisted users into free seats of an event, first come first served
+
+    Runs as a promote_waitlist job (enqueued by leaves, capacity changes and
+    waitlist joins) with its own session, one transaction per seat. Each
+    transaction first takes an advisory lock on the event, so concurrent runs
+    promote one at a time and the head of the queue is never skipped; the seat
+    is taken with the same atomic statement as join_event. Keeps going until the
+    event is full or nobody is waiting, and raises on errors so the job is
+    retried. Returns the number of promoted users.
+    """
+    promoted = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            try:
+                await db.execute(select(func.pg_advisory_xact_lock(func.hashtext("waitlist:" + event_id))))
+                entry = (await db.execute(
+                    select(EventWaitlistModel.id, EventWaitlistModel.user_id)
+                    .where(EventWaitlistModel.event_id == event_id)
+                    .order_by(EventWaitlistModel.created_at, EventWaitlistModel.id)
+                    .limit(1)
+                    .with_for_update()
+                )).first()
+                if entry is None:
+                    await db.rollback()
+                    return promoted
+
+                try:
+                    async with db.begin_nested():
+                        participant_id = await db.scalar(
+                            build_join_statement(event_id, entry.user_id, respect_waitlist=False)
+                        )
+                except IntegrityError:
+                    # Joined on their own meanwhile; their waitlist place is stale
+                    participant_id = None
+                    stale = True
+                else:
+                    stale = False
+
+                if not participant_id and not stale:
+                    # No free seat (or the event is gone): keep the queue as it is
+                    await db.rollback()
+                    return promoted
+
+                await db.execute(delete(EventWaitlistModel).where(EventWaitlistModel.id == entry.id))
+                if participant_id:
+                    await refresh_event_seats(event_id, db)
+                    await publish_event_change(event_id, SEATS, db)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                logger.exception("Waitlist promotion failed", extra={"event_id": event_id, "promoted": promoted})
+                raise
+            if participant_id:
+                promoted += 1
+                await invalidate(EVENTS_TAG, event_tag(event_id))
+                logger.info("Promoted from waitlist", extra={"event_id": event_id, "user_id": entry.user_id})
+
+
+async def list_events(
+    db: AsyncSession,
+    filters: Optional[EventFilters] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Tuple[List[Event], Optional[str]]:
+    """List available events (excluding deleted ones), one keyset page at a time
+
+    Events are ordered by (event_date, id). Returns the page and the cursor
+    of the next page, or None when this is the last page.
+    """
+    filters = filters or EventFilters()
+    query = select_events_with_meal_name().where(EventModel.is_deleted == False)
+
+    if filters.date_from is not None:
+        query = query.where(EventModel.event_date >= filters.date_from)
+    if filters.date_to is not None:
+        query = query.where(EventModel.event_date <= filters.date_to)
+    if filters.max_price is not None:
+        # Events without a price are free
+        query = query.where(or_(EventModel.price == None, EventModel.price <= filters.max_price))
+    if filters.has_free_seats:
+        query = query.where(EventModel.current_participants < EventModel.max_participants)
+    if filters.host_user_id:
+        query = query.where(EventModel.host_user_id == filters.host_user_id)
+    if filters.meal_id:
+        query = query.where(EventModel.meal_id == filters.meal_id)
+    ingredients_condition = ingredient_filter(
+        EventModel.meal_id, filters.include_ingredients, filters.exclude_ingredients
+    )
+    if ingredients_condition is not None:
+        query = query.where(ingredients_condition)
+
+    if cursor:
+        last_date, last_id = decode_cursor(cursor, 2)
+        try:
+            last_date = datetime.fromisoformat(last_date)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(
+            tuple_(EventModel.event_date, EventModel.id) > tuple_(
+                literal(last_date, EventModel.event_date.type),
+                literal(last_id, EventModel.id.type)
+            )
+        )
+
+    try:
+        rows = (await db.execute(
+            query.order_by(EventModel.event_date, EventModel.id).limit(limit + 1)
+        )).all()
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error fetching events: {str(e)}")
 
+    rows, has_more = split_page(rows, limit)
+    next_cursor = None
+    if has_more:
+        last_event = rows[-1][0]
+        next_cursor = encode_cursor(last_event.event_date.isoformat(), last_event.id)
+    return event_rows_to_schemas(rows), next_cursor
+
+
+def distance_km_to(latitude: float, longitude: float):
+    """SQL expression: great-circle distance in km from an event to a point (haversine)"""
+    half_d_lat = func.radians(EventModel.latitude - latitude) * 0.5
+    half_d_lon = func.radians(EventModel.longitude - longitude) * 0.5
+    a = (
+        func.power(func.sin(half_d_lat), 2)
+        + func.cos(func.radians(EventModel.latitude)) * func.cos(func.radians(latitude))
+        * func.power(func.sin(half_d_lon), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * func.asin(func.least(1.0, func.sqrt(a)))
+
+
+async def list_nearby_events(
+    db: AsyncSession,
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    limit: int = 20,
+    date_from: Optional[datetime] = None
+) -> List[NearbyEvent]:
+    """List the live events within radius_km of a point, nearest first
+
+    Candidates come from geohash prefix scans over the cells covering the circle
+    (see utils.geo); the exact distance then filters and orders them.
+    """
+    distance = distance_km_to(latitude, longitude)
+    query = (
+        select_events_with_meal_name()
+        .add_columns(distance)
+        .where(
+            EventModel.is_deleted == False,
+            EventModel.geohash != None,
+            or_(*[
+                # Every geohash starting with cell sorts between cell and cell + "~"
+                and_(EventModel.geohash >= cell, EventModel.geohash < cell + "~")
+                for cell in covering_cells(latitude, longitude, radius_km)
+            ]),
+            distance <= radius_km
+        )
+    )
+    if date_from is not None:
+        query = query.where(EventModel.event_date >= date_from)
+
+    try:
+        rows = (await db.execute(query.order_by(distance, EventModel.id).limit(limit))).all()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error fetching nearby events: {str(e)}")
+
+    return [
+        NearbyEvent(**event_model_to_schema(event_model, meal_name).model_dump(), distance_km=round(distance_km, 3))
+        for event_model, meal_name, distance_km in rows
+    ]
+
 
-async def get_event_details(event_id: str, db: Session) -> Event:
+async def get_event_details(event_id: str, db: AsyncSession) -> Event:
     """Get details of a specific event"""
-    event = get_event(event_id, db)
+    event = await get_event(event_id, db)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     return event
 
 
-async def get_event_participants(event_id: str, db: Session) -> List[EventParticipant]:
+async def get_events_by_ids(event_ids: List[str], db: AsyncSession) -> Tuple[List[Event], List[str]]:
+    """Get many events in one query (excluding deleted ones); returns them in the given order and the IDs not found"""
+    valid_ids, _ = split_valid_ids(event_ids)
+    try:
+        rows = []
+        if valid_ids:
+            rows = (await db.execute(
+                select_events_with_meal_name().where(
+                    EventModel.id.in_(valid_ids),
+                    EventModel.is_deleted == False
+                )
+            )).all()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error fetching events: {str(e)}")
+    return order_batch(event_ids, event_rows_to_schemas(rows), lambda event: event.id)
+
+
+async def get_event_participants(event_id: str, db: AsyncSession) -> List[EventParticipant]:
     """Get all participants for an event"""
     try:
-        participant_models = db.query(EventParticipantModel).filter(
-            EventParticipantModel.event_id == event_id
-        ).all()
+        participant_models = (await db.scalars(
+            select(EventParticipantModel).where(
+                EventParticipantModel.event_id == event_id
+            )
+        )).all()
         return event_participant_models_to_schemas(participant_models)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error fetching participants: {str(e)}")
 
 
-async def get_user_events(user_id: str, db: Session) -> List[Event]:
+async def get_event_participant_summaries(
+    event_id: str,
+    db: AsyncSession,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Tuple[List[ParticipantSummary], Optional[str]]:
+    """List an event's participants with their name and picture, one keyset page at a time
+
+    Participants are ordered by (joined_at, participation id) and joined with
+    users in the same query. Returns the page and the cursor of the next page,
+    or None when this is the last page.
+    """
+    query = (
+        select(
+            EventParticipantModel.id,
+            EventParticipantModel.joined_at,
+            UserModel.id,
+            UserModel.name,
+            UserModel.profile_picture
+        )
+        .join(UserModel, UserModel.id == EventParticipantModel.participant_id)
+        .where(EventParticipantModel.event_id == event_id)
+    )
+
+    if cursor:
+        last_joined_at, last_id = decode_cursor(cursor, 2)
+        try:
+            last_joined_at = datetime.fromisoformat(last_joined_at)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(
+            tuple_(EventParticipantModel.joined_at, EventParticipantModel.id) > tuple_(
+                literal(last_joined_at, EventParticipantModel.joined_at.type),
+                literal(last_id, EventParticipantModel.id.type)
+            )
+        )
+
+    try:
+        rows = (await db.execute(
+            query.order_by(EventParticipantModel.joined_at, EventParticipantModel.id).limit(limit + 1)
+        )).all()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error fetching participants: {str(e)}")
+
+    rows, has_more = split_page(rows, limit)
+    next_cursor = None
+    if has_more:
+        participation_id, joined_at = rows[-1][0], rows[-1][1]
+        next_cursor = encode_cursor(joined_at.isoformat(), participation_id)
+    summaries = [
+        ParticipantSummary(id=user_id, name=name, profile_picture=profile_picture, joined_at=joined_at)
+        for _, joined_at, user_id, name, profile_picture in rows
+    ]
+    return summaries, next_cursor
+
+
+async def get_user_events(user_id: str, db: AsyncSession) -> List[Event]:
     """Get all events created by a specific user (excluding deleted ones)"""
     try:
-        event_models = db.query(EventModel).filter(
-            EventModel.host_user_id == user_id,
-            EventModel.is_deleted == False
-        ).all()
-        # Convert each event with its meal name
-        events = []
-        for event_model in event_models:
-            meal_name = get_meal_name(event_model.meal_id, db)
-            events.append(event_model_to_schema(event_model, meal_name))
-        return events
+        rows = (await db.execute(
+            select_events_with_meal_name().where(
+                EventModel.host_user_id == user_id,
+                EventModel.is_deleted == False
+            )
+        )).all()
+        return event_rows_to_schemas(rows)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error fetching user events: {str(e)}")
 
 
-async def get_user_joined_events(user_id: str, db: Session) -> List[Event]:
+async def get_user_joined_events(user_id: str, db: AsyncSession) -> List[Event]:
     """Get all events that a user has joined (excluding deleted ones)"""
     try:
-        # First get all event IDs that the user has joined
-        participant_models = db.query(EventParticipantModel).filter(
+        # Resolve the joined event IDs as a subquery so everything comes back in one round-trip
+        joined_event_ids = select(EventParticipantModel.event_id).where(
             EventParticipantModel.participant_id == user_id
-        ).all()
-
-        if not participant_models:
-            return []
-
-        event_ids = [participant.event_id for participant in participant_models]
-
-        # Then get the full event details for those events (excluding deleted ones)
-        event_models = db.query(EventModel).filter(
-            EventModel.id.in_(event_ids),
-            EventModel.is_deleted == False
-        ).all()
-        # Convert each event with its meal name
-        events = []
-        for event_model in event_models:
-            meal_name = get_meal_name(event_model.meal_id, db)
-            events.append(event_model_to_schema(event_model, meal_name))
-        return events
+        )
+        rows = (await db.execute(
+            select_events_with_meal_name().where(
+                EventModel.id.in_(joined_event_ids),
+                EventModel.is_deleted == False
+            )
+        )).all()
+        return event_rows_to_schemas(rows)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error fetching joined events: {str(e)}")
 
 
-async def update_event(event_id: str, event_update: EventUpdate, user_id: str, db: Session) -> Event:
+async def update_event(event_id: str, event_update: EventUpdate, user_id: str, db: AsyncSession) -> Event:
     """Update an existing event (only the host can update)"""
-    # Get the event
-    event_model = db.query(EventModel).filter(EventModel.id == event_id).first()
+    # Get the event, locked so no join lands between the capacity check below and the commit
+    event_model = await db.scalar(select(EventModel).where(EventModel.id == event_id).with_for_update())
     if not event_model:
         raise HTTPException(status_code=404, detail="Event not found")
 
@@ -288,6 +724,7 @@ async def update_event(event_id: str, event_update: EventUpdate, user_id: str, d
 
         if event_update.location is not None:
             event_model.location = event_update.location
+            locate_event(event_model)
 
         if event_update.event_date is not None:
             # Convert string to datetime
@@ -297,22 +734,29 @@ async def update_event(event_id: str, event_update: EventUpdate, user_id: str, d
         if event_update.price is not None:
             event_model.price = event_update.price
 
-        db.commit()
-        db.refresh(event_model)
+        await db.flush()
+        await refresh_event_card(event_id, db)
+        await publish_event_change(event_id, UPDATED, db)
+        if event_update.max_participants is not None:
+            # Raising the capacity frees seats for the waitlist
+            await enqueue_job(PROMOTE_WAITLIST_JOB, {"event_id": event_id}, db)
+        await db.commit()
+        await invalidate(EVENTS_TAG, event_tag(event_id))
+        await db.refresh(event_model)
 
-        meal_name = get_meal_name(event_model.meal_id, db)
+        meal_name = await get_meal_name(event_model.meal_id, db)
         return event_model_to_schema(event_model, meal_name)
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=f"Error updating event: {str(e)}")
 
 
-async def soft_delete_event(event_id: str, user_id: str, db: Session) -> Dict[str, str]:
+async def soft_delete_event(event_id: str, user_id: str, db: AsyncSession) -> Dict[str, str]:
     """Soft delete an event (only the host can delete)"""
     # Get the event (including deleted ones for this operation)
-    event_model = db.query(EventModel).filter(EventModel.id == event_id).first()
+    event_model = await db.scalar(select(EventModel).where(EventModel.id == event_id))
     if not event_model:
         raise HTTPException(status_code=404, detail="Event not found")
 
@@ -327,8 +771,12 @@ async def soft_delete_event(event_id: str, user_id: str, db: Session) -> Dict[st
     try:
         # Soft delete: set is_deleted to True
         event_model.is_deleted = True
-        db.commit()
+        await db.flush()
+        await refresh_event_card(event_id, db)
+        await publish_event_change(event_id, DELETED, db)
+        await db.commit()
+        await invalidate(EVENTS_TAG, event_tag(event_id))
         return {"message": "Event successfully deleted", "event_id": event_id}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=f"Error deleting event: {str(e)}")
\ No newline at end of file
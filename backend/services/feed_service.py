@@ -0,0 +1,165 @@
+from fastapi import HTTPException
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, delete, func, literal, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+
+from models.event import EventModel
+from models.event_feed import EventFeedModel
+from models.meal import MealModel
+from models.user import UserModel
+from schemas.event import EventCard
+from utils.converters import event_feed_model_to_card
+from utils.pagination import encode_cursor, decode_cursor, split_page
+
+# event_feed columns, in the order select_feed_rows() produces them
+_FEED_COLUMNS = [
+    "event_id", "host_user_id", "meal_id", "title", "description", "location", "event_date", "price",
+    "image_url", "image_variants", "max_participants", "current_participants", "seats_left",
+    "meal_title", "host_name", "host_profile_picture", "host_profile_picture_variants", "created_at",
+]
+
+
+def select_feed_rows(condition=None):
+    """Build the statement computing feed rows of live events from the source tables
+
+    condition, on EventModel columns, limits which events are computed.
+    """
+    query = (
+        select(
+            EventModel.id,
+            EventModel.host_user_id,
+            EventModel.meal_id,
+            EventModel.title,
+            EventModel.description,
+            EventModel.location,
+            EventModel.event_date,
+            EventModel.price,
+            EventModel.image_url,
+            EventModel.image_variants,
+            EventModel.max_participants,
+            EventModel.current_participants,
+            func.greatest(EventModel.max_participants - EventModel.current_participants, 0),
+            MealModel.title,
+            UserModel.name,
+            UserModel.profile_picture,
+            UserModel.profile_picture_variants,
+            EventModel.created_at,
+        )
+        .join(UserModel, UserModel.id == EventModel.host_user_id)
+        .outerjoin(MealModel, and_(MealModel.id == EventModel.meal_id, MealModel.is_deleted == False))
+        .where(EventModel.is_deleted == False)
+    )
+    if condition is not None:
+        query = query.where(condition)
+    return query
+
+
+async def _refresh_feed(condition, db: AsyncSession) -> None:
+    """Recompute the feed rows of the events matching condition, inside the caller's transaction
+
+    The events are read FOR SHARE: a join or leave committed after this statement
+    started is waited for and its row version used, so the seat counts it wrote
+    to the feed are not overwritten with older ones.
+    """
+    rows = select_feed_rows(condition).with_for_update(read=True, of=EventModel)
+    upsert = insert(EventFeedModel).from_select(_FEED_COLUMNS, rows)
+    await db.execute(
+        upsert.on_conflict_do_update(
+            index_elements=[EventFeedModel.event_id],
+            set_={
+                **{name: upsert.excluded[name] for name in _FEED_COLUMNS if name != "event_id"},
+                "refreshed_at": func.now(),
+            }
+        )
+    )
+    # Deleted events leave the feed
+    await db.execute(
+        delete(EventFeedModel).where(
+            EventFeedModel.event_id.in_(select(EventModel.id).where(condition, EventModel.is_deleted == True))
+        )
+    )
+
+
+async def refresh_event_card(event_id: str, db: AsyncSession) -> None:
+    """Bring the feed row of one event up to date; call before committing an event write"""
+    await _refresh_feed(EventModel.id == event_id, db)
+
+
+async def refresh_event_seats(event_id: str, db: AsyncSession) -> None:
+    """Copy an event's seat count to its feed row; call before committing a join or leave
+
+    Seat changes touch nothing else on the card, so this is a one-row UPDATE by
+    primary key rather than a full refresh, keeping the event row lock short.
+    """
+    await db.execute(
+        update(EventFeedModel)
+        .where(EventFeedModel.event_id == event_id, EventModel.id == EventFeedModel.event_id)
+        .values(
+            current_participants=EventModel.current_participants,
+            seats_left=func.greatest(EventModel.max_participants - EventModel.current_participants, 0),
+            refreshed_at=func.now()
+        )
+    )
+
+
+async def refresh_meal_cards(meal_id: str, db: AsyncSession) -> None:
+    """Bring the feed rows of every event serving a meal up to date; call before committing a meal write"""
+    await _refresh_feed(EventModel.meal_id == meal_id, db)
+
+
+async def refresh_host_cards(user_id: str, db: AsyncSession) -> None:
+    """Bring the feed rows of every event hosted by a user up to date; call before committing a user write"""
+    await _refresh_feed(EventModel.host_user_id == user_id, db)
+
+
+async def rebuild_feed(db: AsyncSession) -> int:
+    """Recreate the whole feed from the source tables; the caller commits. Returns the number of rows
+
+    Runs as one transaction, so readers keep seeing the old feed until it commits.
+    """
+    await db.execute(delete(EventFeedModel))
+    await db.execute(insert(EventFeedModel).from_select(_FEED_COLUMNS, select_feed_rows()))
+    return await db.scalar(select(func.count()).select_from(EventFeedModel))
+
+
+async def list_feed(
+    db: AsyncSession,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    has_free_seats: bool = False
+) -> Tuple[List[EventCard], Optional[str]]:
+    """List event cards from the feed, one keyset page at a time, ordered by (event_date, id)"""
+    query = select(EventFeedModel)
+    if date_from is not None:
+        query = query.where(EventFeedModel.event_date >= date_from)
+    if has_free_seats:
+        query = query.where(EventFeedModel.seats_left > 0)
+
+    if cursor:
+        last_date, last_id = decode_cursor(cursor, 2)
+        try:
+            last_date = datetime.fromisoformat(last_date)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(
+            tuple_(EventFeedModel.event_date, EventFeedModel.event_id) > tuple_(
+                literal(last_date, EventFeedModel.event_date.type),
+                literal(last_id, EventFeedModel.event_id.type)
+            )
+        )
+
+    try:
+        cards = (await db.scalars(
+            query.order_by(EventFeedModel.event_date, EventFeedModel.event_id).limit(limit + 1)
+        )).all()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error fetching event feed: {str(e)}")
+
+    cards, has_more = split_page(cards, limit)
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(cards[-1].event_date.isoformat(), cards[-1].event_id)
+    return [event_feed_model_to_card(card) for card in cards], next_cursor
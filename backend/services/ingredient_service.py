@@ -0,0 +1,77 @@
+from typing import List, Optional
+from sqlalchemy import select, delete, exists, and_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+import uuid
+
+from models.ingredient import IngredientModel, MealIngredientModel
+from utils.ingredients import ingredient_terms, parse_ingredients, normalize_ingredient_filter
+
+# Upper bound on ingredients per include/exclude filter, keeping the generated query small
+MAX_INGREDIENT_FILTERS = 10
+
+
+async def sync_meal_ingredients(meal_id: str, ingredients: Optional[str], db: AsyncSession) -> List[str]:
+    """Make the ingredient index of a meal match its free-text ingredients
+
+    The index holds the terms of every ingredient (see utils.ingredients). Runs
+    inside the caller's transaction; the caller commits. Returns the normalized
+    ingredient names.
+    """
+    names = parse_ingredients(ingredients)
+    terms = []
+    for name in names:
+        terms.extend(term for term in ingredient_terms(name) if term not in terms)
+
+    ingredient_ids = []
+    if terms:
+        # Concurrent meals may introduce the same ingredient; the unique name makes that a no-op,
+        # and inserting in sorted order keeps overlapping inserts from deadlocking
+        await db.execute(
+            insert(IngredientModel)
+            .values([{"id": str(uuid.uuid4()), "name": term} for term in sorted(terms)])
+            .on_conflict_do_nothing(index_elements=[IngredientModel.name])
+        )
+        ingredient_ids = (await db.scalars(
+            select(IngredientModel.id).where(IngredientModel.name.in_(terms))
+        )).all()
+
+    stale = delete(MealIngredientModel).where(MealIngredientModel.meal_id == meal_id)
+    if ingredient_ids:
+        stale = stale.where(MealIngredientModel.ingredient_id.not_in(ingredient_ids))
+    await db.execute(stale)
+
+    if ingredient_ids:
+        await db.execute(
+            insert(MealIngredientModel)
+            .values([
+                {"id": str(uuid.uuid4()), "meal_id": meal_id, "ingredient_id": ingredient_id}
+                for ingredient_id in ingredient_ids
+            ])
+            .on_conflict_do_nothing(index_elements=[MealIngredientModel.meal_id, MealIngredientModel.ingredient_id])
+        )
+    return names
+
+
+def _has_ingredient(meal_id_column, names: List[str]):
+    return exists().where(
+        MealIngredientModel.meal_id == meal_id_column,
+        MealIngredientModel.ingredient_id == IngredientModel.id,
+        IngredientModel.name.in_(names)
+    )
+
+
+def ingredient_filter(meal_id_column, include: Optional[List[str]] = None, exclude: Optional[List[str]] = None):
+    """SQL condition on a meal id column: the meal has every included and none of the excluded ingredients
+
+    Filter values are normalized and made singular like the index terms, so they
+    match whole ingredients as well as words and word runs inside them (excluding
+    "peanut" drops a meal with "peanut butter"). Returns None when there is
+    nothing to filter on.
+    """
+    include = normalize_ingredient_filter(include)
+    exclude = normalize_ingredient_filter(exclude)
+    conditions = [_has_ingredient(meal_id_column, [name]) for name in include[:MAX_INGREDIENT_FILTERS]]
+    if exclude:
+        conditions.append(~_has_ingredient(meal_id_column, exclude[:MAX_INGREDIENT_FILTERS]))
+    return and_(*conditions) if conditions else None
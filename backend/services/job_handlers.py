@@ -0,0 +1,21 @@
+from typing import Any, Dict
+
+from utils.uploads import delete_image
+from .job_service import job_handler
+
+DELETE_IMAGES_JOB = "delete_images"
+PROMOTE_WAITLIST_JOB = "promote_waitlist"
+
+
+@job_handler(DELETE_IMAGES_JOB, concurrency=4)
+async def delete_images(payload: Dict[str, Any]) -> None:
+    """Remove a replaced image and its variants from storage (removing missing objects is a no-op)"""
+    await delete_image(payload["url"], payload["bucket"], payload.get("variants"))
+
+
+@job_handler(PROMOTE_WAITLIST_JOB, concurrency=4)
+async def promote_waitlist(payload: Dict[str, Any]) -> None:
+    """Fill an event's free seats from its waitlist until it is full or nobody is waiting"""
+    # Imported here: event_service enqueues this job, so it imports this module
+    from .event_service import promote_from_waitlist
+    await promote_from_waitlist(payload["event_id"])
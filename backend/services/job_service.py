@@ -0,0 +1,197 @@
+"""
+Durable background jobs
+Services enqueue side effects (e.g. deleting replaced images) as rows of the jobs
+table, inside their own transaction, so a job exists exactly when the write that
+needs it committed. worker.py claims due jobs and runs their handlers outside any
+transaction, so slow storage calls never hold a request or a database session.
+
+Claiming locks the job type with a transaction-level advisory lock, counts the
+type's running jobs against its concurrency limit, and takes due jobs with
+FOR UPDATE SKIP LOCKED, so any number of worker processes share the queue and
+together never exceed a type's limit. A failed job is retried with exponential
+backoff until max_attempts, then kept as dead for inspection. A running job
+whose worker died is taken over once its lease expires.
+"""
+import os
+import random
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, List
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+import uuid
+
+from models.job import JobModel
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+DEAD = "dead"
+
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_BACKOFF_BASE_SECONDS = float(os.getenv("JOB_BACKOFF_BASE_SECONDS", "10"))
+JOB_BACKOFF_MAX_SECONDS = float(os.getenv("JOB_BACKOFF_MAX_SECONDS", "3600"))
+# A running job not finished within its lease is considered abandoned and run again
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+# Per-type concurrency overrides across all workers, e.g. JOB_CONCURRENCY="delete_images=4"
+JOB_CONCURRENCY = os.getenv("JOB_CONCURRENCY", "")
+JOB_RETENTION_DAYS = float(os.getenv("JOB_RETENTION_DAYS", "7"))
+
+
+@dataclass
+class JobType:
+    name: str
+    handler: Callable[[Dict[str, Any]], Awaitable[None]]
+    concurrency: int
+    max_attempts: int
+
+
+JOB_TYPES: Dict[str, JobType] = {}
+
+
+def _parse_concurrency(spec: str) -> Dict[str, int]:
+    limits = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, limit = item.rsplit("=", 1)
+            limits[name.strip()] = int(limit)
+    return limits
+
+
+_concurrency_overrides = _parse_concurrency(JOB_CONCURRENCY)
+
+
+def job_handler(name: str, concurrency: int = 2, max_attempts: int = JOB_MAX_ATTEMPTS):
+    """Register an async handler(payload) for a job type; it must be safe to run more than once"""
+    def decorator(handler):
+        JOB_TYPES[name] = JobType(name, handler, _concurrency_overrides.get(name, concurrency), max_attempts)
+        return handler
+    return decorator
+
+
+async def enqueue_job(
+    job_type: str,
+    payload: Dict[str, Any],
+    db: AsyncSession,
+    delay_seconds: float = 0
+) -> str:
+    """Add a job inside the caller's transaction; it becomes visible to workers when the caller commits"""
+    job = JobModel(
+        id=str(uuid.uuid4()),
+        job_type=job_type,
+        payload=payload,
+        status=PENDING,
+        attempts=0,
+        max_attempts=JOB_TYPES[job_type].max_attempts if job_type in JOB_TYPES else JOB_MAX_ATTEMPTS,
+    )
+    if delay_seconds:
+        job.run_at = func.now() + timedelta(seconds=delay_seconds)
+    db.add(job)
+    return job.id
+
+
+async def claim_jobs(job_type: str, worker_id: str, db: AsyncSession, limit: int) -> List[JobModel]:
+    """Mark up to limit due jobs of a type as running by this worker, within the type's concurrency limit
+
+    Commits; the claimed jobs are returned with their incremented attempt count.
+    """
+    job = JOB_TYPES[job_type]
+    now = func.now()
+    lease_start = now - timedelta(seconds=JOB_LEASE_SECONDS)
+    try:
+        # Serializes claimers of this type until commit, so the running count below stays true
+        await db.execute(select(func.pg_advisory_xact_lock(func.hashtext("jobs:" + job_type))))
+        running = await db.scalar(
+            select(func.count()).select_from(JobModel).where(
+                JobModel.job_type == job_type,
+                JobModel.status == RUNNING,
+                JobModel.locked_at > lease_start
+            )
+        )
+        slots = min(limit, job.concurrency - running)
+        if slots <= 0:
+            await db.commit()
+            return []
+
+        due = (
+            select(JobModel.id)
+            .where(
+                JobModel.job_type == job_type,
+                or_(
+                    and_(JobModel.status == PENDING, JobModel.run_at <= now),
+                    and_(JobModel.status == RUNNING, JobModel.locked_at <= lease_start)
+                )
+            )
+            .order_by(JobModel.run_at)
+            .limit(slots)
+            .with_for_update(skip_locked=True)
+        )
+        claimed = (await db.scalars(
+            update(JobModel)
+            .where(JobModel.id.in_(due.scalar_subquery()))
+            .values(status=RUNNING, locked_at=now, locked_by=worker_id, attempts=JobModel.attempts + 1)
+            .returning(JobModel)
+        )).all()
+        await db.commit()
+        return list(claimed)
+    except Exception:
+        await db.rollback()
+        raise
+
+
+async def complete_job(job_id: str, worker_id: str, db: AsyncSession) -> None:
+    """Mark a job claimed by this worker as done"""
+    await db.execute(
+        update(JobModel)
+        .where(JobModel.id == job_id, JobModel.locked_by == worker_id, JobModel.status == RUNNING)
+        .values(status=DONE, finished_at=func.now(), locked_at=None, last_error=None)
+    )
+    await db.commit()
+
+
+def retry_delay_seconds(attempts: int) -> float:
+    """Exponential backoff with jitter, so failing jobs do not retry in lockstep"""
+    delay = min(JOB_BACKOFF_MAX_SECONDS, JOB_BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0))
+    return delay * random.uniform(0.8, 1.2)
+
+
+async def fail_job(job: JobModel, worker_id: str, error: str, db: AsyncSession) -> str:
+    """Schedule a retry of a failed job, or mark it dead once out of attempts; returns the new status"""
+    status = DEAD if job.attempts >= job.max_attempts else PENDING
+    values = {"status": status, "locked_at": None, "last_error": error[:2000]}
+    if status == PENDING:
+        values["run_at"] = func.now() + timedelta(seconds=retry_delay_seconds(job.attempts))
+    else:
+        values["finished_at"] = func.now()
+    await db.execute(
+        update(JobModel)
+        .where(JobModel.id == job.id, JobModel.locked_by == worker_id, JobModel.status == RUNNING)
+        .values(**values)
+    )
+    await db.commit()
+    return status
+
+
+async def purge_finished_jobs(db: AsyncSession) -> int:
+    """Delete done jobs older than JOB_RETENTION_DAYS; dead jobs are kept until handled by hand"""
+    deleted = await db.execute(
+        delete(JobModel).where(
+            JobModel.status == DONE,
+            JobModel.finished_at < func.now() - timedelta(days=JOB_RETENTION_DAYS)
+        )
+    )
+    await db.commit()
+    return deleted.rowcount
+
+
+async def get_job_stats(db: AsyncSession) -> Dict[str, Dict[str, int]]:
+    """Number of jobs per type and status"""
+    rows = (await db.execute(
+        select(JobModel.job_type, JobModel.status, func.count())
+        .group_by(JobModel.job_type, JobModel.status)
+    )).all()
+    stats: Dict[str, Dict[str, int]] = {}
+    for job_type, status, count in rows:
+        stats.setdefault(job_type, {})[status] = count
+    return stats
@@ -1,50 +1,36 @@
 from fastapi import HTTPException, UploadFile
-from typing import Dict, List, Optional
-from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, func, or_, and_, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
+import re
 import uuid
 
 from models.meal import MealModel
 from schemas.meal import Meal, MealCreate, MealUpdate
 from utils.converters import meal_model_to_schema, meal_models_to_schemas
-from utils.supabase import supabase
+from utils.batch import split_valid_ids, order_batch
+from utils.pagination import encode_cursor, decode_cursor, split_page
+from utils.response_cache import invalidate, EVENTS_TAG, meal_tag
+from utils.uploads import upload_image
 from .user_service import get_user
+from .ingredient_service import sync_meal_ingredients, ingredient_filter
+from .feed_service import refresh_meal_cards
 
+# Words beyond this are ignored, keeping search-as-you-type queries cheap
+MAX_SEARCH_TERMS = 8
 
-async def upload_meal_image(image: UploadFile) -> str:
-    """Upload a meal image to Supabase Storage and return the public URL"""
-    try:
-        # Validate file type
-        allowed_types = ["image/jpeg", "image/jpg", "image/png", "image/webp"]
-        if image.content_type not in allowed_types:
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid file type. Please select a JPEG, PNG, or WebP image"
-            )
-
-        # Validate file size (5MB max)
-        contents = await image.read()
-        if len(contents) > 5 * 1024 * 1024:  # 5MB in bytes
-            raise HTTPException(
-                status_code=400,
-                detail="File size must be less than 5MB"
-            )
 
-        # Generate unique filename
-        file_extension = image.filename.split('.')[-1] if image.filename else 'jpg'
-        unique_filename = f"{uuid.uuid4()}_{int(datetime.now().timestamp())}.{file_extension}"
-
-        # Upload to Supabase Storage (using meal-images bucket)
-        result = supabase.storage.from_("meal-images").upload(
-            unique_filename,
-            contents,
-            {"content-type": image.content_type}
+async def upload_meal_image(image: UploadFile) -> Tuple[str, Dict[str, str]]:
+    """Upload a meal image to storage and return the public URLs of it and its variants"""
+    try:
+        return await upload_image(
+            image,
+            bucket="meal-images",
+            allowed_types=["image/jpeg", "image/jpg", "image/png", "image/webp"],
+            invalid_type_detail="Invalid file type. Please select a JPEG, PNG, or WebP image",
+            too_large_detail="File size must be less than 5MB"
         )
-
-        # Get public URL
-        public_url = supabase.storage.from_("meal-images").get_public_url(unique_filename)
-
-        return public_url
     except HTTPException:
         raise
     except Exception as e:
@@ -56,7 +42,7 @@ async def create_meal(
     description: str,
     ingredients: str,
     user_id: str,
-    db: Session,
+    db: AsyncSession,
     image: Optional[UploadFile] = None
 ) -> Meal:
     """Create a new meal with optional image upload"""
@@ -68,8 +54,9 @@ async def create_meal(
     try:
         # Upload image if provided
         image_url = None
+        image_variants = None
         if image and image.filename:
-            image_url = await upload_meal_image(image)
+            image_url, image_variants = await upload_meal_image(image)
 
         # Create new meal model
         meal_model = MealModel(
@@ -79,40 +66,127 @@ async def create_meal(
             description=description,
             ingredients=ingredients,
             image_url=image_url,
+            image_variants=image_variants,
             is_deleted=False,
         )
 
         db.add(meal_model)
-        db.commit()
-        db.refresh(meal_model)
+        await db.flush()
+        await sync_meal_ingredients(meal_model.id, ingredients, db)
+        await db.commit()
+        await db.refresh(meal_model)
 
         return meal_model_to_schema(meal_model)
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=f"Error creating meal: {str(e)}")
 
 
-async def get_user_meals(user_id: str, db: Session) -> List[Meal]:
+async def get_user_meals(user_id: str, db: AsyncSession) -> List[Meal]:
     """Get all meals created by a specific user (excluding deleted ones)"""
     try:
-        meal_models = db.query(MealModel).filter(
-            MealModel.user_id == user_id,
-            MealModel.is_deleted == False
-        ).order_by(MealModel.created_at.desc()).all()
+        meal_models = (await db.scalars(
+            select(MealModel).where(
+                MealModel.user_id == user_id,
+                MealModel.is_deleted == False
+            ).order_by(MealModel.created_at.desc())
+        )).all()
         return meal_models_to_schemas(meal_models)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error fetching user meals: {str(e)}")
 
 
-async def get_meal(meal_id: str, db: Session) -> Meal:
+def build_prefix_tsquery(query: str) -> Optional[str]:
+    """Turn free text into a to_tsquery expression matching every word as a prefix
+
+    "tomato bas" becomes "tomato:* & bas:*", so partially typed words already match.
+    Only word characters are kept, so user input can never produce tsquery syntax.
+    """
+    words = re.findall(r"\w+", query.lower())[:MAX_SEARCH_TERMS]
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+
+async def list_meals(
+    db: AsyncSession,
+    query: Optional[str] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    include_ingredients: Optional[List[str]] = None,
+    exclude_ingredients: Optional[List[str]] = None
+) -> Tuple[List[Meal], Optional[str]]:
+    """Discover live meals, one keyset page at a time
+
+    With a query, meals are matched by full-text search over title, ingredients and
+    description (in that order of weight) and ordered by rank, then id. Without one,
+    the newest meals come first. Meals can be restricted to those containing every
+    included and none of the excluded (normalized) ingredients. Returns the page and
+    the cursor of the next page, or None when this is the last page.
+    """
+    tsquery = build_prefix_tsquery(query or "")
+    statement = select(MealModel).where(MealModel.is_deleted == False)
+
+    ingredients_condition = ingredient_filter(MealModel.id, include_ingredients, exclude_ingredients)
+    if ingredients_condition is not None:
+        statement = statement.where(ingredients_condition)
+
+    if tsquery:
+        document = MealModel.search_vector
+        ts_query = func.to_tsquery("simple", tsquery)
+        rank = func.ts_rank(document, ts_query)
+        statement = statement.add_columns(rank.label("rank")).where(document.op("@@")(ts_query))
+        if cursor:
+            last_rank, last_id = decode_cursor(cursor, 2)
+            if not isinstance(last_rank, (int, float)):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            statement = statement.where(or_(
+                rank < last_rank,
+                and_(rank == last_rank, MealModel.id > literal(last_id, MealModel.id.type))
+            ))
+        statement = statement.order_by(rank.desc(), MealModel.id)
+    else:
+        if cursor:
+            last_created_at, last_id = decode_cursor(cursor, 2)
+            try:
+                last_created_at = datetime.fromisoformat(last_created_at)
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            statement = statement.where(
+                tuple_(MealModel.created_at, MealModel.id) < tuple_(
+                    literal(last_created_at, MealModel.created_at.type),
+                    literal(last_id, MealModel.id.type)
+                )
+            )
+        statement = statement.order_by(MealModel.created_at.desc(), MealModel.id.desc())
+
+    try:
+        rows = (await db.execute(statement.limit(limit + 1))).all()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error fetching meals: {str(e)}")
+
+    rows, has_more = split_page(rows, limit)
+    next_cursor = None
+    if has_more:
+        last_meal = rows[-1][0]
+        if tsquery:
+            next_cursor = encode_cursor(rows[-1][1], last_meal.id)
+        else:
+            next_cursor = encode_cursor(last_meal.created_at.isoformat(), last_meal.id)
+    return meal_models_to_schemas([row[0] for row in rows]), next_cursor
+
+
+async def get_meal(meal_id: str, db: AsyncSession) -> Meal:
     """Get a specific meal by ID (excluding deleted ones)"""
     try:
-        meal_model = db.query(MealModel).filter(
-            MealModel.id == meal_id,
-            MealModel.is_deleted == False
-        ).first()
+        meal_model = await db.scalar(
+            select(MealModel).where(
+                MealModel.id == meal_id,
+                MealModel.is_deleted == False
+            )
+        )
         if not meal_model:
             raise HTTPException(status_code=404, detail="Meal not found")
         return meal_model_to_schema(meal_model)
@@ -122,23 +196,42 @@ async def get_meal(meal_id: str, db: Session) -> Meal:
         raise HTTPException(status_code=400, detail=f"Error fetching meal: {str(e)}")
 
 
-def get_meal_name(meal_id: str, db: Session) -> str:
+async def get_meals_by_ids(meal_ids: List[str], db: AsyncSession) -> Tuple[List[Meal], List[str]]:
+    """Get many meals in one query (excluding deleted ones); returns them in the given order and the IDs not found"""
+    valid_ids, _ = split_valid_ids(meal_ids)
+    try:
+        meal_models = []
+        if valid_ids:
+            meal_models = (await db.scalars(
+                select(MealModel).where(
+                    MealModel.id.in_(valid_ids),
+                    MealModel.is_deleted == False
+                )
+            )).all()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error fetching meals: {str(e)}")
+    return order_batch(meal_ids, meal_models_to_schemas(meal_models), lambda meal: meal.id)
+
+
+async def get_meal_name(meal_id: str, db: AsyncSession) -> str:
     """Get meal name by ID - returns empty string if not found (excluding deleted ones)"""
     try:
-        meal_model = db.query(MealModel).filter(
-            MealModel.id == meal_id,
-            MealModel.is_deleted == False
-        ).first()
-        return meal_model.title if meal_model else ""
+        meal_title = await db.scalar(
+            select(MealModel.title).where(
+                MealModel.id == meal_id,
+                MealModel.is_deleted == False
+            )
+        )
+        return meal_title or ""
     except Exception:
         return ""
 
 
-async def update_meal(meal_id: str, meal_update: MealUpdate, user_id: str, db: Session) -> Meal:
+async def update_meal(meal_id: str, meal_update: MealUpdate, user_id: str, db: AsyncSession) -> Meal:
     """Update an existing meal (only the creator can update)"""
     from typing import Dict, Any
     # Get the meal
-    meal_model = db.query(MealModel).filter(MealModel.id == meal_id).first()
+    meal_model = await db.scalar(select(MealModel).where(MealModel.id == meal_id))
     if not meal_model:
         raise HTTPException(status_code=404, detail="Meal not found")
 
@@ -156,23 +249,30 @@ async def update_meal(meal_id: str, meal_update: MealUpdate, user_id: str, db: S
 
         if meal_update.ingredients is not None:
             meal_model.ingredients = meal_update.ingredients
+            await sync_meal_ingredients(meal_model.id, meal_update.ingredients, db)
+
+        if meal_update.title is not None:
+            await db.flush()
+            await refresh_meal_cards(meal_id, db)
 
-        db.commit()
-        db.refresh(meal_model)
+        await db.commit()
+        # Event listings show meal titles and filter on meal ingredients
+        await invalidate(meal_tag(meal_id), EVENTS_TAG)
+        await db.refresh(meal_model)
 
         return meal_model_to_schema(meal_model)
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=f"Error updating meal: {str(e)}")
 
 
-async def soft_delete_meal(meal_id: str, user_id: str, db: Session) -> Dict[str, str]:
+async def soft_delete_meal(meal_id: str, user_id: str, db: AsyncSession) -> Dict[str, str]:
     """Soft delete a meal (only the creator can delete)"""
     from typing import Dict
     # Get the meal (including deleted ones for this operation)
-    meal_model = db.query(MealModel).filter(MealModel.id == meal_id).first()
+    meal_model = await db.scalar(select(MealModel).where(MealModel.id == meal_id))
     if not meal_model:
         raise HTTPException(status_code=404, detail="Meal not found")
 
@@ -187,8 +287,11 @@ async def soft_delete_meal(meal_id: str, user_id: str, db: Session) -> Dict[str,
     try:
         # Soft delete: set is_deleted to True
         meal_model.is_deleted = True
-        db.commit()
+        await db.flush()
+        await refresh_meal_cards(meal_id, db)
+        await db.commit()
+        await invalidate(meal_tag(meal_id), EVENTS_TAG)
         return {"message": "Meal successfully deleted", "meal_id": meal_id}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=f"Error deleting meal: {str(e)}")
\ No newline at end of file
@@ -1,40 +1,59 @@
 from fastapi import HTTPException, UploadFile
-from typing import Optional, List
-from sqlalchemy.orm import Session
-from datetime import datetime
+from typing import Dict, Optional, List, Tuple
+from sqlalchemy import select, func, or_, and_, literal
+from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
 
 from models.user import UserModel
 from schemas.user import User, UserCreate, UserLogin, UserUpdate, LoginResponse
-from utils.password import hash_password, verify_password, create_access_token
+from utils.password import hash_password_async, verify_password_async, create_access_token
 from utils.converters import user_model_to_schema, user_models_to_schemas
-from utils.supabase import supabase
+from utils.batch import split_valid_ids, order_batch
+from utils.logger import get_logger
+from utils.pagination import encode_cursor, decode_cursor, split_page
+from utils.response_cache import invalidate, user_tag, FEED_TAG
+from utils.uploads import upload_image
+from .feed_service import refresh_host_cards
+from .job_handlers import DELETE_IMAGES_JOB
+from .job_service import enqueue_job
 
+logger = get_logger(__name__)
 
-async def get_user(user_id: str, db: Session) -> Optional[User]:
+
+async def get_user(user_id: str, db: AsyncSession) -> Optional[User]:
     """Get user by ID from database"""
     try:
-        user_model = db.query(UserModel).filter(UserModel.id == user_id).first()
+        user_model = await db.scalar(select(UserModel).where(UserModel.id == user_id))
         if user_model:
             return user_model_to_schema(user_model)
         return None
-    except Exception as e:
-        print(f"Error getting user: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Error getting user", extra={"user_id": user_id})
         return None
 
 
-async def create_user(user: UserCreate, db: Session) -> User:
+async def get_users_by_ids(user_ids: List[str], db: AsyncSession) -> Tuple[List[User], List[str]]:
+    """Get many users in one query; returns them in the given order and the IDs not found"""
+    valid_ids, _ = split_valid_ids(user_ids)
+    try:
+        user_models = []
+        if valid_ids:
+            user_models = (await db.scalars(select(UserModel).where(UserModel.id.in_(valid_ids)))).all()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error fetching users: {str(e)}")
+    return order_batch(user_ids, user_models_to_schemas(user_models), lambda user: user.id)
+
+
+async def create_user(user: UserCreate, db: AsyncSession) -> User:
     """Create a new user"""
     try:
         # Check if user with email already exists
-        existing_user = db.query(UserModel).filter(UserModel.email == user.email).first()
+        existing_user = await db.scalar(select(UserModel).where(UserModel.email == user.email))
         if existing_user:
             raise HTTPException(status_code=400, detail="Email already registered")
 
         # Hash password
-        hashed_password = hash_password(user.password)
+        hashed_password = await hash_password_async(user.password)
 
         # Create new user model
         user_model = UserModel(
@@ -47,46 +66,46 @@ async def create_user(user: UserCreate, db: Session) -> User:
         )
 
         db.add(user_model)
-        db.commit()
-        db.refresh(user_model)
+        await db.commit()
+        await db.refresh(user_model)
 
         return user_model_to_schema(user_model)
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        print(str(e))
+        await db.rollback()
+        logger.exception("Error creating user")
         raise HTTPException(status_code=400, detail=f"Error creating user: {str(e)}")
 
 
-def get_user_by_email(email: str, db: Session) -> Optional[UserModel]:
+async def get_user_by_email(email: str, db: AsyncSession) -> Optional[UserModel]:
     """Get user by email from database - returns model for auth purposes"""
     try:
-        return db.query(UserModel).filter(UserModel.email == email).first()
-    except Exception as e:
-        print(f"Error getting user by email: {e}")
+        return await db.scalar(select(UserModel).where(UserModel.email == email))
+    except Exception:
+        logger.exception("Error getting user by email")
         return None
 
 
-def get_user_by_id(user_id: str, db: Session) -> Optional[UserModel]:
+async def get_user_by_id(user_id: str, db: AsyncSession) -> Optional[UserModel]:
     """Get user by ID from database - returns model for auth purposes"""
     try:
-        return db.query(UserModel).filter(UserModel.id == user_id).first()
-    except Exception as e:
-        print(f"Error getting user by ID: {e}")
+        return await db.scalar(select(UserModel).where(UserModel.id == user_id))
+    except Exception:
+        logger.exception("Error getting user by ID", extra={"user_id": user_id})
         return None
 
 
-async def authenticate_user(login_data: UserLogin, db: Session) -> LoginResponse:
+async def authenticate_user(login_data: UserLogin, db: AsyncSession) -> LoginResponse:
     """Authenticate user and return JWT token"""
-    user_model = get_user_by_email(login_data.email, db)
+    user_model = await get_user_by_email(login_data.email, db)
     if not user_model:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    if not verify_password(login_data.password, user_model.hashed_password):
+    if not await verify_password_async(login_data.password, user_model.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    print(f"Creating token with user ID: {user_model.id} (type: {type(user_model.id)})")
+    logger.debug("Creating token", extra={"user_id": user_model.id})
     access_token = create_access_token(data={"userId": user_model.id})
 
     return LoginResponse(
@@ -96,10 +115,19 @@ async def authenticate_user(login_data: UserLogin, db: Session) -> LoginResponse
     )
 
 
-async def update_user(user_id: str, user_update: UserUpdate, db: Session) -> User:
-    """Update user information"""
+async def update_user(
+    user_id: str,
+    user_update: UserUpdate,
+    db: AsyncSession,
+    profile_picture_variants: Optional[Dict[str, str]] = None
+) -> User:
+    """Update user information
+
+    Resized variants only exist for pictures stored by upload_profile_picture,
+    so setting profile_picture replaces the variants with the given ones (or none).
+    """
     try:
-        user_model = db.query(UserModel).filter(UserModel.id == user_id).first()
+        user_model = await db.scalar(select(UserModel).where(UserModel.id == user_id))
         if not user_model:
             raise HTTPException(status_code=404, detail="User not found")
 
@@ -110,98 +138,124 @@ async def update_user(user_id: str, user_update: UserUpdate, db: Session) -> Use
             user_model.description = user_update.description
         if user_update.profile_picture is not None:
             user_model.profile_picture = user_update.profile_picture
+            user_model.profile_picture_variants = profile_picture_variants
+            # Event cards show their host's picture
+            await db.flush()
+            await refresh_host_cards(user_id, db)
 
-        db.commit()
-        db.refresh(user_model)
+        await db.commit()
+        await invalidate(user_tag(user_id), FEED_TAG)
+        await db.refresh(user_model)
 
         return user_model_to_schema(user_model)
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        print(f"Error updating user: {e}")
-        import traceback
-        traceback.print_exc()
+        await db.rollback()
+        logger.exception("Error updating user", extra={"user_id": user_id})
         raise HTTPException(status_code=400, detail=f"Error updating user: {str(e)}")
 
 
-async def search_users(query: str, db: Session, limit: int = 10) -> List[User]:
-    """Search users by name"""
-    try:
-        if not query or len(query.strip()) < 2:
-            return []
-
-        # Use ilike for case-insensitive search
-        user_models = db.query(UserModel).filter(
-            UserModel.name.ilike(f"%{query.strip()}%")
-        ).limit(limit).all()
+def _contains_pattern(term: str) -> str:
+    """ILIKE pattern matching term anywhere, with LIKE wildcards in term taken literally"""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+async def search_users(
+    query: str,
+    db: AsyncSession,
+    limit: int = 10,
+    university: Optional[str] = None,
+    cursor: Optional[str] = None
+) -> Tuple[List[User], Optional[str]]:
+    """Fuzzy search users by name, best matches first
+
+    Names containing the query, or with a word similar to it (pg_trgm word
+    similarity), are matched through the trigram index on users.name and ranked
+    by similarity, then id. Returns the page and the cursor of the next page,
+    or None when this is the last page.
+    """
+    term = (query or "").strip()
+    if len(term) < 2:
+        return [], None
+
+    score = func.word_similarity(term, UserModel.name)
+    statement = select(UserModel, score.label("score")).where(
+        or_(
+            UserModel.name.ilike(_contains_pattern(term), escape="\\"),
+            # name %> term: word_similarity(term, name) above pg_trgm.word_similarity_threshold
+            UserModel.name.op("%>")(term)
+        )
+    )
+    if university and university.strip():
+        statement = statement.where(UserModel.university.ilike(_contains_pattern(university.strip()), escape="\\"))
+
+    if cursor:
+        last_score, last_id = decode_cursor(cursor, 2)
+        if not isinstance(last_score, (int, float)):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        statement = statement.where(or_(
+            score < last_score,
+            and_(score == last_score, UserModel.id > literal(last_id, UserModel.id.type))
+        ))
 
-        return user_models_to_schemas(user_models)
+    try:
+        rows = (await db.execute(
+            statement.order_by(score.desc(), UserModel.id).limit(limit + 1)
+        )).all()
     except Exception as e:
-        print(f"Error searching users: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error searching users")
         raise HTTPException(status_code=400, detail=f"Error searching users: {str(e)}")
 
+    rows, has_more = split_page(rows, limit)
+    next_cursor = None
+    if has_more:
+        last_user, last_score = rows[-1]
+        next_cursor = encode_cursor(last_score, last_user.id)
+    return user_models_to_schemas([user for user, _ in rows]), next_cursor
 
-async def upload_profile_picture(user_id: str, image: UploadFile, db: Session) -> User:
-    """Upload a profile picture to Supabase Storage and update user profile"""
-    try:
-        # Validate file type (only JPEG and PNG)
-        allowed_types = ["image/jpeg", "image/jpg", "image/png"]
-        if image.content_type not in allowed_types:
-            raise HTTPException(
-                status_code=400,
-                detail="Tipo de arquivo inválido. Apenas imagens JPEG e PNG são permitidas."
-            )
-
-        # Validate file size (5MB max)
-        contents = await image.read()
-        if len(contents) > 5 * 1024 * 1024:  # 5MB in bytes
-            raise HTTPException(
-                status_code=400,
-                detail="Tamanho do arquivo excede o limite de 5MB."
-            )
 
+async def upload_profile_picture(user_id: str, image: UploadFile, db: AsyncSession) -> User:
+    """Upload a profile picture to storage and update user profile"""
+    try:
         # Get current user to check for existing profile picture
         current_user = await get_user(user_id, db)
         if not current_user:
             raise HTTPException(status_code=404, detail="Usuário não encontrado")
 
-        # Delete old profile picture if it exists
-        old_picture_url = current_user.profile_picture
-        if old_picture_url:
-            try:
-                # Extract filename from URL
-                if "profile-pictures/" in old_picture_url:
-                    old_filename = old_picture_url.split("profile-pictures/")[-1].split("?")[0]
-                    supabase.storage.from_("profile-pictures").remove([old_filename])
-            except Exception as e:
-                print(f"Error deleting old profile picture: {e}")
-                # Continue with upload even if deletion fails
-
-        # Generate unique filename
-        file_extension = image.filename.split('.')[-1] if image.filename else 'jpg'
-        unique_filename = f"{user_id}_{uuid.uuid4()}_{int(datetime.now().timestamp())}.{file_extension}"
-
-        # Upload to Supabase Storage
-        result = supabase.storage.from_("profile-pictures").upload(
-            unique_filename,
-            contents,
-            {"content-type": image.content_type}
+        # Validate (only JPEG and PNG, 5MB max) and upload the new picture
+        public_url, variant_urls = await upload_image(
+            image,
+            bucket="profile-pictures",
+            allowed_types=["image/jpeg", "image/jpg", "image/png"],
+            invalid_type_detail="Tipo de arquivo inválido. Apenas imagens JPEG e PNG são permitidas.",
+            too_large_detail="Tamanho do arquivo excede o limite de 5MB.",
+            filename_prefix=f"{user_id}_"
         )
 
-        # Get public URL
-        public_url = supabase.storage.from_("profile-pictures").get_public_url(unique_filename)
+        # Delete the old picture once the new one is in place; the worker removes it from storage.
+        # The job is added to the session first, so update_user commits it together with the new
+        # picture (or rolls both back)
+        old_picture_url = current_user.profile_picture
+        if old_picture_url:
+            await enqueue_job(DELETE_IMAGES_JOB, {
+                "bucket": "profile-pictures",
+                "url": old_picture_url,
+                "variants": current_user.profile_picture_variants,
+            }, db)
 
         # Update user profile with new picture URL
-        updated_user = await update_user(user_id, UserUpdate(profile_picture=public_url), db)
+        updated_user = await update_user(
+            user_id,
+            UserUpdate(profile_picture=public_url),
+            db,
+            profile_picture_variants=variant_urls
+        )
 
         return updated_user
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error uploading profile picture: {e}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=400, detail=f"Erro ao fazer upload da foto: {str(e)}")
\ No newline at end of file
+        logger.exception("Error uploading profile picture", extra={"user_id": user_id})
+        raise HTTPException(status_code=400, detail=f"Erro ao fazer upload da foto: {str(e)}")
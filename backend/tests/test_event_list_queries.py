@@ -0,0 +1,89 @@
+"""
+Query count of the event list
+GET /events/ resolves each event's meal title in the same query, so the number of
+statements it runs must not grow with the number of events returned.
+
+Runs against the database configured in .env (initialized with init_db.py); the
+rows it seeds are removed afterwards. Skipped when that database is unreachable.
+From backend/:
+    python -m unittest discover tests
+"""
+import os
+import unittest
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# Every request must reach the database, not the response cache
+os.environ["RESPONSE_CACHE_TTL_SECONDS"] = "0"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, text
+from sqlalchemy.exc import OperationalError
+
+import main
+from models.event import EventModel
+from models.meal import MealModel
+from models.user import UserModel
+from utils.database import SessionLocal
+from utils.query_stats import QUERY_COUNT_HEADER
+
+
+class EventListQueryCountTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            with SessionLocal() as db:
+                db.execute(text("SELECT 1"))
+        except OperationalError as e:
+            raise unittest.SkipTest(f"database unreachable: {e}")
+
+        cls.host_id = str(uuid.uuid4())
+        cls.meal_ids = [str(uuid.uuid4()), str(uuid.uuid4())]
+        starts = datetime.now(timezone.utc) + timedelta(days=1)
+        with SessionLocal() as db:
+            db.add(UserModel(id=cls.host_id, name="test host", email=f"{cls.host_id}@test.local", hashed_password="x"))
+            db.flush()
+            for meal_id in cls.meal_ids:
+                db.add(MealModel(
+                    id=meal_id, user_id=cls.host_id, title=f"meal {meal_id[:8]}",
+                    description="test meal", ingredients="rice", is_deleted=False
+                ))
+            db.flush()
+            # One event of the first meal, many of the second
+            for meal_id, count in zip(cls.meal_ids, (1, 25)):
+                for i in range(count):
+                    db.add(EventModel(
+                        host_user_id=cls.host_id, meal_id=meal_id, title=f"event {i}", description="test event",
+                        max_participants=4, current_participants=0, location="test location",
+                        event_date=starts + timedelta(hours=i), is_deleted=False
+                    ))
+            db.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        with SessionLocal() as db:
+            db.execute(delete(EventModel).where(EventModel.host_user_id == cls.host_id))
+            db.execute(delete(MealModel).where(MealModel.user_id == cls.host_id))
+            db.execute(delete(UserModel).where(UserModel.id == cls.host_id))
+            db.commit()
+
+    def list_events(self, client, meal_id):
+        response = client.get("/events/", params={"meal_id": meal_id, "limit": 100})
+        self.assertEqual(response.status_code, 200, response.text)
+        return response.json(), int(response.headers[QUERY_COUNT_HEADER])
+
+    def test_query_count_does_not_grow_with_events(self):
+        # One client, so every request runs on the same event loop and connection pool
+        with TestClient(main.app) as client:
+            one, one_count = self.list_events(client, self.meal_ids[0])
+            many, many_count = self.list_events(client, self.meal_ids[1])
+
+        self.assertEqual(len(one), 1)
+        self.assertEqual(len(many), 25)
+        self.assertTrue(all(event["mealName"] == f"meal {self.meal_ids[1][:8]}" for event in many))
+        self.assertEqual(one_count, many_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Ingredient parsing and filter normalization
+Filters are matched against the index terms of utils.ingredients, so excluding
+an ingredient must also drop meals where it is only one word of an ingredient.
+
+No database needed. From backend/:
+    python -m unittest discover tests
+"""
+import unittest
+
+from sqlalchemy.dialects import postgresql
+
+from models.meal import MealModel
+from services.ingredient_service import ingredient_filter
+from utils.ingredients import (
+    ingredient_terms,
+    normalize_ingredient,
+    normalize_ingredient_filter,
+    parse_ingredients,
+    singularize,
+)
+
+
+def meal_terms(ingredients):
+    return {term for name in parse_ingredients(ingredients) for term in ingredient_terms(name)}
+
+
+class ParseIngredientsTest(unittest.TestCase):
+
+    def test_splits_and_strips_quantities(self):
+        self.assertEqual(
+            parse_ingredients("200g Tofu, 2 tomatoes; sesame oil\n• 3 cups of rice - 2 colheres de açúcar"),
+            ["tofu", "tomatoes", "sesame oil", "rice", "acucar"]
+        )
+
+    def test_normalizes_case_accents_and_punctuation(self):
+        self.assertEqual(normalize_ingredient("  Pão (integral)! "), "pao integral")
+        self.assertIsNone(normalize_ingredient(" 2 "))
+
+    def test_keeps_unique_names_in_order(self):
+        self.assertEqual(parse_ingredients("Rice, tofu, RICE"), ["rice", "tofu"])
+        self.assertEqual(parse_ingredients(None), [])
+
+
+class IngredientTermsTest(unittest.TestCase):
+
+    def test_singularize(self):
+        for plural, singular in [
+            ("peanuts", "peanut"), ("tomatoes", "tomato"), ("berries", "berry"), ("peaches", "peach"),
+            ("cheeses", "cheese"), ("ovos", "ovo"), ("hummus", "hummus"), ("pao", "pao"), ("peanut", "peanut"),
+        ]:
+            self.assertEqual(singularize(plural), singular)
+
+    def test_terms_hold_every_word_run(self):
+        self.assertEqual(
+            ingredient_terms("crunchy peanut butter"),
+            ["crunchy peanut butter", "crunchy peanut", "peanut butter", "crunchy", "peanut", "butter"]
+        )
+
+    def test_terms_skip_runs_at_stopwords(self):
+        self.assertEqual(ingredient_terms("juice of lemons"), ["juice of lemon", "juice", "lemon"])
+
+
+class IngredientFilterTest(unittest.TestCase):
+
+    def test_filter_values_are_split_normalized_and_singular(self):
+        self.assertEqual(
+            normalize_ingredient_filter(["Peanuts, TOMATOES", "peanut", " Peanut Butter "]),
+            ["peanut", "tomato", "peanut butter"]
+        )
+        self.assertEqual(normalize_ingredient_filter(None), [])
+
+    def test_excluded_word_matches_inside_ingredients(self):
+        terms = meal_terms("crushed peanuts, peanut butter")
+        for value in ("peanuts", "peanut", "peanut butter", "Crushed Peanuts"):
+            self.assertTrue(set(normalize_ingredient_filter([value])) <= terms, value)
+        self.assertFalse(set(normalize_ingredient_filter(["almonds"])) & terms)
+
+    def test_multi_word_filter_needs_the_whole_run(self):
+        terms = meal_terms("crunchy peanut butter")
+        self.assertTrue(set(normalize_ingredient_filter(["peanut butter"])) <= terms)
+        self.assertFalse(set(normalize_ingredient_filter(["butter peanut"])) & terms)
+
+    def test_condition_uses_normalized_terms(self):
+        condition = ingredient_filter(MealModel.id, include=["Tomatoes"], exclude=["peanuts"])
+        params = condition.compile(dialect=postgresql.dialect()).params
+        self.assertEqual(sorted(value for value in params.values() if isinstance(value, list)), [["peanut"], ["tomato"]])
+        self.assertIsNone(ingredient_filter(MealModel.id, [], None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,54 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
+import hashlib
+import os
+import time
 
-from utils.password import verify_token
+from utils.cache import TTLCache
+from utils.password import decode_token
 from utils.database import get_db
+from utils.converters import user_model_to_schema
+from utils.logger import get_logger
 
 security = HTTPBearer()
+logger = get_logger(__name__)
+
+# Verified tokens, keyed by token digest. Entries never outlive the token's own expiry.
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+
+_token_cache = TTLCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL_SECONDS)
+
+
+def verify_token_cached(token: str) -> str:
+    """Verify a JWT token, reusing earlier verifications of the same token until it expires"""
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    cached = _token_cache.get(key)
+    if cached is not None:
+        user_id, expires_at = cached
+        if expires_at is None or expires_at > time.time():
+            return user_id
+        _token_cache.delete(key)
+
+    payload = decode_token(token)
+    user_id = str(payload["userId"])
+    expires_at = payload.get("exp")
+
+    ttl = TOKEN_CACHE_TTL_SECONDS
+    if expires_at is not None:
+        ttl = min(ttl, expires_at - time.time())
+    _token_cache.set(key, (user_id, expires_at), ttl)
+    return user_id
+
+
+def get_auth_cache_stats() -> dict:
+    """Hit-rate counters of the verified-token cache"""
+    return {
+        "token": _token_cache.stats(),
+    }
+
 
 async def get_current_user_id(credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)]) -> str:
     """
@@ -22,12 +64,11 @@ async def get_current_user_id(credentials: Annotated[HTTPAuthorizationCredential
         HTTPException: If token is invalid or missing
     """
     try:
-        user_id = verify_token(credentials.credentials)
-        print(f"Auth received user_id: {user_id} (type: {type(user_id)})")
+        user_id = verify_token_cached(credentials.credentials)
         # Return user_id as string (UUID)
         return str(user_id)
     except Exception as e:
-        print(f"Error verifying token: {e}")
+        logger.info("Rejected bearer token", extra={"reason": getattr(e, "detail", None) or str(e)})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
@@ -36,7 +77,7 @@ async def get_current_user_id(credentials: Annotated[HTTPAuthorizationCredential
 
 async def get_current_user(
     user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_db)]
 ):
     """
     Dependency to verify that the user exists in the database.
@@ -46,20 +87,20 @@ async def get_current_user(
         db: Database session
 
     Returns:
-        UserModel: User model from database
+        User: User from database
 
     Raises:
         HTTPException: If user doesn't exist
     """
     from services.user_service import get_user_by_id
 
-    user = get_user_by_id(user_id, db)
+    user_model = await get_user_by_id(user_id, db)
 
-    if not user:
+    if not user_model:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    return user
\ No newline at end of file
+    return user_model_to_schema(user_model)
@@ -0,0 +1,57 @@
+"""
+Batch lookup helpers
+Batch endpoints take a list of IDs (repeated ?ids=...&ids=... or comma-separated),
+resolve them in one IN query and answer in request order, listing the IDs that
+were not found.
+"""
+import uuid
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from fastapi import HTTPException
+
+MAX_BATCH_IDS = 200
+
+T = TypeVar("T")
+
+
+def _canonical(value: str) -> str:
+    """Canonical text form of a UUID, as the database returns it; other values are kept as is"""
+    try:
+        return str(uuid.UUID(value))
+    except ValueError:
+        return value
+
+
+def parse_batch_ids(values: Optional[List[str]]) -> List[str]:
+    """Split, canonicalize, deduplicate and bound the requested IDs, keeping their order"""
+    ids = []
+    for value in values or []:
+        for part in value.split(","):
+            part = _canonical(part.strip())
+            if part and part not in ids:
+                ids.append(part)
+    if not ids:
+        raise HTTPException(status_code=400, detail="At least one id is required")
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids can be requested at once")
+    return ids
+
+
+def split_valid_ids(ids: List[str]) -> Tuple[List[str], List[str]]:
+    """Separate well-formed UUIDs, which can be queried, from the rest, which cannot exist"""
+    valid, invalid = [], []
+    for value in ids:
+        try:
+            uuid.UUID(value)
+            valid.append(value)
+        except ValueError:
+            invalid.append(value)
+    return valid, invalid
+
+
+def order_batch(ids: List[str], found: Sequence[T], key: Callable[[T], str]) -> Tuple[List[T], List[str]]:
+    """Arrange found items in request order and return them with the IDs that were missing"""
+    by_id: Dict[str, T] = {key(item): item for item in found}
+    items = [by_id[value] for value in ids if value in by_id]
+    missing = [value for value in ids if value not in by_id]
+    return items, missing
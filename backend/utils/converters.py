@@ -2,13 +2,14 @@
 Model to Schema converters
 Eliminates code duplication by providing reusable conversion functions
 """
-from typing import List
+from typing import List, Optional, Sequence, Tuple
 from models.user import UserModel
 from models.event import EventModel
+from models.event_feed import EventFeedModel
 from models.event_participant import EventParticipantModel
 from models.meal import MealModel
 from schemas.user import User
-from schemas.event import Event
+from schemas.event import Event, EventCard
 from schemas.event_participant import EventParticipant
 from schemas.meal import Meal
 
@@ -22,29 +23,57 @@ def user_model_to_schema(user_model: UserModel) -> User:
         university=user_model.university,
         description=user_model.description,
         profile_picture=user_model.profile_picture,
+        profile_picture_variants=user_model.profile_picture_variants,
         created_at=user_model.created_at
     )
 
 
-def event_model_to_schema(event_model: EventModel, meal_name: str = "") -> Event:
+def event_model_to_schema(event_model: EventModel, meal_name: Optional[str] = "") -> Event:
     """Convert EventModel to Event schema"""
     return Event(
         id=event_model.id,
         host_user_id=event_model.host_user_id,
         meal_id=event_model.meal_id,
-        meal_name=meal_name,
+        meal_name=meal_name or "",
         title=event_model.title,
         description=event_model.description,
         max_participants=event_model.max_participants,
         current_participants=event_model.current_participants,
         location=event_model.location,
+        latitude=event_model.latitude,
+        longitude=event_model.longitude,
         event_date=event_model.event_date,
         image_url=event_model.image_url,
+        image_variants=event_model.image_variants,
         price=event_model.price,
         created_at=event_model.created_at
     )
 
 
+def event_feed_model_to_card(feed_model: EventFeedModel) -> EventCard:
+    """Convert an EventFeedModel row to an EventCard schema"""
+    return EventCard(
+        id=feed_model.event_id,
+        host_user_id=feed_model.host_user_id,
+        meal_id=feed_model.meal_id,
+        title=feed_model.title,
+        description=feed_model.description,
+        location=feed_model.location,
+        event_date=feed_model.event_date,
+        price=feed_model.price,
+        image_url=feed_model.image_url,
+        image_variants=feed_model.image_variants,
+        max_participants=feed_model.max_participants,
+        current_participants=feed_model.current_participants,
+        seats_left=feed_model.seats_left,
+        meal_name=feed_model.meal_title or "",
+        host_name=feed_model.host_name,
+        host_profile_picture=feed_model.host_profile_picture,
+        host_profile_picture_variants=feed_model.host_profile_picture_variants,
+        created_at=feed_model.created_at
+    )
+
+
 def event_participant_model_to_schema(participant_model: EventParticipantModel) -> EventParticipant:
     """Convert EventParticipantModel to EventParticipant schema"""
     return EventParticipant(
@@ -65,6 +94,11 @@ def event_models_to_schemas(event_models: List[EventModel]) -> List[Event]:
     return [event_model_to_schema(event) for event in event_models]
 
 
+def event_rows_to_schemas(rows: Sequence[Tuple[EventModel, Optional[str]]]) -> List[Event]:
+    """Convert (EventModel, meal title) rows to Event schemas"""
+    return [event_model_to_schema(event, meal_name) for event, meal_name in rows]
+
+
 def event_participant_models_to_schemas(participant_models: List[EventParticipantModel]) -> List[EventParticipant]:
     """Convert a list of EventParticipantModels to EventParticipant schemas"""
     return [event_participant_model_to_schema(participant) for participant in participant_models]
@@ -79,6 +113,7 @@ def meal_model_to_schema(meal_model: MealModel) -> Meal:
         description=meal_model.description,
         ingredients=meal_model.ingredients,
         image_url=meal_model.image_url,
+        image_variants=meal_model.image_variants,
         created_at=meal_model.created_at
     )
 
@@ -1,7 +1,17 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from fastapi import Request
+from collections import deque
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+from typing import Optional
+import asyncio
 import os
+import time
+
+from utils.cache import TTLCache
+from utils.logger import get_logger
 
 load_dotenv()
 
@@ -13,16 +23,306 @@ DBNAME = os.getenv("DB_NAME")
 
 sslmode = "disable" if HOST in ["localhost", "127.0.0.1"] else "require"
 DATABASE_URL = f"postgresql+psycopg2://{USER}:{PASSWORD}@{HOST}:{PORT}/{DBNAME}?sslmode={sslmode}"
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{USER}:{PASSWORD}@{HOST}:{PORT}/{DBNAME}?ssl={sslmode}"
+
+# Connection pool tuning; the defaults match SQLAlchemy's, plus pre-ping and recycle
+# so stale SSL connections to the managed Postgres are replaced instead of failing
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ["1", "true", "yes"]
+# Per-statement timeout enforced by Postgres; 0 disables it
+STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+POOL_OPTIONS = {
+    "pool_size": POOL_SIZE,
+    "max_overflow": MAX_OVERFLOW,
+    "pool_timeout": POOL_TIMEOUT,
+    "pool_recycle": POOL_RECYCLE,
+    "pool_pre_ping": POOL_PRE_PING,
+}
+
+sync_connect_args = {"options": f"-c statement_timeout={STATEMENT_TIMEOUT_MS}"} if STATEMENT_TIMEOUT_MS else {}
+async_connect_args = {"server_settings": {"statement_timeout": str(STATEMENT_TIMEOUT_MS)}} if STATEMENT_TIMEOUT_MS else {}
 
-engine = create_engine(DATABASE_URL)
+# Blocking engine, only used by standalone scripts such as init_db.py
+engine = create_engine(DATABASE_URL, connect_args=sync_connect_args, **POOL_OPTIONS)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Non-blocking engine used by the API: queries are awaited instead of stalling the event loop
+async_engine = create_async_engine(ASYNC_DATABASE_URL, connect_args=async_connect_args, **POOL_OPTIONS)
+
+# expire_on_commit is disabled so committed models can still be read without an implicit (blocking) refresh
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# Optional streaming replica serving read-only routes (see get_read_db); it shares the
+# primary's credentials and database name. Without DB_REPLICA_HOST every read uses the primary
+REPLICA_HOST = os.getenv("DB_REPLICA_HOST", "")
+REPLICA_PORT = os.getenv("DB_REPLICA_PORT") or PORT
+# Reads go back to the primary while the replica is further behind than this
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("DB_REPLICA_LAG_CHECK_SECONDS", "1"))
+# A user who wrote reads from the primary for this long; never shorter than the lag the
+# replica may have, so once it ends the replica is known to contain the write
+REPLICA_STICKY_SECONDS = max(
+    float(os.getenv("DB_REPLICA_STICKY_SECONDS", "0")),
+    REPLICA_MAX_LAG_SECONDS + REPLICA_LAG_CHECK_SECONDS
+)
+REPLICA_STICKY_SIZE = int(os.getenv("DB_REPLICA_STICKY_SIZE", "10000"))
+# Where recent writers are remembered; Redis lets every API worker see them (defaults to the response cache's)
+REPLICA_STICKY_REDIS_URL = os.getenv("DB_REPLICA_STICKY_REDIS_URL") or os.getenv("RESPONSE_CACHE_REDIS_URL", "")
+
+replica_engine = None
+ReplicaSessionLocal = None
+if REPLICA_HOST:
+    replica_sslmode = "disable" if REPLICA_HOST in ["localhost", "127.0.0.1"] else "require"
+    REPLICA_DATABASE_URL = (
+        f"postgresql+asyncpg://{USER}:{PASSWORD}@{REPLICA_HOST}:{REPLICA_PORT}/{DBNAME}?ssl={replica_sslmode}"
+    )
+    replica_engine = create_async_engine(REPLICA_DATABASE_URL, connect_args=async_connect_args, **POOL_OPTIONS)
+    ReplicaSessionLocal = async_sessionmaker(bind=replica_engine, autoflush=False, expire_on_commit=False)
+
+# Request scope key caching the database chosen for a read-only request (see choose_read_route)
+READ_ROUTE_SCOPE_KEY = "db.read_route"
+REPLICA = "replica"
+STICKY = "sticky"
+
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
+logger = get_logger(__name__)
+
+# Time spent by requests waiting for a pooled connection
+_pool_wait = {"count": 0, "total": 0.0, "max": 0.0}
+_replica_pool_wait = {"count": 0, "total": 0.0, "max": 0.0}
+_replica_lag = {"seconds": None, "checked_at": float("-inf")}
+_replica_lag_lock = asyncio.Lock()
+# (time, primary WAL position) samples taken by get_replica_lag, oldest first
+_wal_samples: deque = deque(maxlen=3600)
+# Where read-only requests went, and why they fell back to the primary
+_read_routes = {REPLICA: 0, "no_replica": 0, STICKY: 0, "lagging": 0}
+
+
+class MemoryStickyUsers:
+    """Recent writers remembered by this process only"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.users = TTLCache(maxsize, ttl)
+
+    async def mark(self, user_id: str) -> None:
+        self.users.set(user_id, True)
+
+    async def is_sticky(self, user_id: str) -> bool:
+        return self.users.get(user_id) is not None
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "users": len(self.users)}
+
+
+class RedisStickyUsers:
+    """Recent writers shared by every worker through Redis"""
+
+    def __init__(self, url: str, ttl: float):
+        # Optional dependency, only needed when a Redis URL is configured
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.ttl_ms = int(ttl * 1000)
+
+    async def mark(self, user_id: str) -> None:
+        await self.client.set(f"replica:sticky:{user_id}", 1, px=self.ttl_ms)
+
+    async def is_sticky(self, user_id: str) -> bool:
+        return bool(await self.client.exists(f"replica:sticky:{user_id}"))
+
+    def stats(self) -> dict:
+        return {"backend": "redis"}
+
+
+_sticky_users = (
+    RedisStickyUsers(REPLICA_STICKY_REDIS_URL, REPLICA_STICKY_SECONDS) if REPLICA_STICKY_REDIS_URL
+    else MemoryStickyUsers(REPLICA_STICKY_SIZE, REPLICA_STICKY_SECONDS)
+)
+
+
+def _request_user_id(request: Request) -> Optional[str]:
+    """User id of a request's bearer token, or None when it has no valid one"""
+    from utils.auth import verify_token_cached
+
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return verify_token_cached(token)
+    except Exception:
+        return None
+
+
+async def _mark_sticky(user_id: str) -> None:
     try:
+        await _sticky_users.mark(user_id)
+    except Exception:
+        logger.exception("Remembering a replica-sticky user failed", extra={"user_id": user_id})
+
+
+@asynccontextmanager
+async def _checked_out_session(session_factory, wait: dict):
+    async with session_factory() as db:
+        started = time.perf_counter()
+        await db.connection()
+        waited = time.perf_counter() - started
+        wait["count"] += 1
+        wait["total"] += waited
+        wait["max"] = max(wait["max"], waited)
+        yield db
+
+
+async def get_db(request: Request):
+    """Session on the primary, for routes that write
+
+    With a replica, the requesting user is marked as a recent writer before the
+    route runs, so the mark is in place when its write commits, and again once
+    it is done, so stickiness lasts DB_REPLICA_STICKY_SECONDS after the write.
+    """
+    user_id = _request_user_id(request) if replica_engine is not None else None
+    if user_id is not None:
+        await _mark_sticky(user_id)
+    async with _checked_out_session(AsyncSessionLocal, _pool_wait) as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
+    if user_id is not None:
+        await _mark_sticky(user_id)
+
+
+def _parse_lsn(lsn: str) -> int:
+    high, low = lsn.split("/")
+    return (int(high, 16) << 32) + int(low, 16)
+
+
+async def _measure_replica_lag() -> Optional[float]:
+    """Seconds since the newest moment the replica is known to have fully replayed; None if unknown
+
+    The primary's WAL position is sampled on every check. Once the replica has
+    replayed up to a sample, it holds every commit made before that sample was
+    taken. A replica that stops receiving WAL (disconnected or stalled) falls ever
+    further behind the samples, while an idle primary keeps its position and so
+    a caught-up replica stays current.
+    """
+    sampled_at = time.monotonic()
+    async with async_engine.connect() as connection:
+        primary_lsn = await connection.scalar(text("SELECT CAST(pg_current_wal_lsn() AS text)"))
+    _wal_samples.append((sampled_at, _parse_lsn(primary_lsn)))
+
+    async with replica_engine.connect() as connection:
+        replayed = await connection.scalar(text("SELECT CAST(pg_last_wal_replay_lsn() AS text)"))
+    if replayed is None:
+        # Not a standby
+        return None
+    replayed = _parse_lsn(replayed)
+
+    covered = [taken_at for taken_at, lsn in _wal_samples if lsn <= replayed]
+    if not covered:
+        return None
+    # Older samples no longer matter: replay never goes backwards
+    while _wal_samples[0][0] < covered[-1]:
+        _wal_samples.popleft()
+    return time.monotonic() - covered[-1]
+
+
+async def get_replica_lag() -> Optional[float]:
+    """Replication lag in seconds, measured at most every DB_REPLICA_LAG_CHECK_SECONDS; None if unknown
+
+    While one request measures it, concurrent ones use the previous measurement.
+    """
+    if (
+        time.monotonic() - _replica_lag["checked_at"] < REPLICA_LAG_CHECK_SECONDS
+        or _replica_lag_lock.locked()
+    ):
+        return _replica_lag["seconds"]
+
+    async with _replica_lag_lock:
+        try:
+            _replica_lag["seconds"] = await _measure_replica_lag()
+        except Exception:
+            logger.exception("Measuring replica lag failed")
+            _replica_lag["seconds"] = None
+        _replica_lag["checked_at"] = time.monotonic()
+    return _replica_lag["seconds"]
+
+
+async def choose_read_route(request: Request) -> str:
+    """Pick the database of a read-only request: REPLICA, or the reason to use the primary
+
+    Decided once per request; the choice is kept in its scope.
+    """
+    route = request.scope.get(READ_ROUTE_SCOPE_KEY)
+    if route is not None:
+        return route
+
+    if replica_engine is None:
+        route = "no_replica"
+    else:
+        user_id = _request_user_id(request)
+        try:
+            sticky = user_id is not None and await _sticky_users.is_sticky(user_id)
+        except Exception:
+            logger.exception("Checking a replica-sticky user failed", extra={"user_id": user_id})
+            sticky = True
+        if sticky:
+            route = STICKY
+        else:
+            lag = await get_replica_lag()
+            route = "lagging" if lag is None or lag > REPLICA_MAX_LAG_SECONDS else REPLICA
+    request.scope[READ_ROUTE_SCOPE_KEY] = route
+    return route
+
+
+async def get_read_db(request: Request):
+    """Session for read-only routes: the replica when configured and current enough, else the primary
+
+    Never write through it. A user reads their own writes: for
+    DB_REPLICA_STICKY_SECONDS after writing on the primary their reads stay there.
+    """
+    route = await choose_read_route(request)
+    _read_routes[route] += 1
+    if route == REPLICA:
+        session_factory, wait = ReplicaSessionLocal, _replica_pool_wait
+    else:
+        session_factory, wait = AsyncSessionLocal, _pool_wait
+    async with _checked_out_session(session_factory, wait) as db:
+        yield db
+
+
+def _engine_pool_stats(engine, wait: dict) -> dict:
+    pool = engine.pool
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": wait["count"],
+        "wait_seconds_total": round(wait["total"], 6),
+        "wait_seconds_max": round(wait["max"], 6),
+        "wait_seconds_avg": round(wait["total"] / wait["count"], 6) if wait["count"] else 0.0,
+    }
+
+
+def get_pool_stats() -> dict:
+    """Live statistics of the API connection pool"""
+    return _engine_pool_stats(async_engine, _pool_wait)
+
+
+def get_replica_stats() -> dict:
+    """Replica lag, where read-only requests were routed, and the replica connection pool"""
+    stats = {
+        "configured": replica_engine is not None,
+        "lag_seconds": _replica_lag["seconds"],
+        "max_lag_seconds": REPLICA_MAX_LAG_SECONDS,
+        "sticky_seconds": REPLICA_STICKY_SECONDS,
+        "sticky_users": _sticky_users.stats(),
+        "reads": dict(_read_routes),
+    }
+    if replica_engine is not None:
+        stats["pool"] = _engine_pool_stats(replica_engine, _replica_pool_wait)
+    return stats
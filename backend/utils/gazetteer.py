@@ -0,0 +1,73 @@
+"""
+Campus gazetteer
+Resolves the free-text location of an event ("Bandejão Central, 2nd floor") to
+coordinates using a local JSON list of campus places, so no external geocoding
+service is involved. The file (CAMPUS_GAZETTEER_PATH) holds entries like
+
+    [{"name": "Bandejão Central", "aliases": ["central"], "latitude": -23.56, "longitude": -46.72}]
+
+A location resolves to the place whose name or alias it equals or, failing that,
+the longest name or alias it contains as whole words. Unknown locations have no
+coordinates.
+"""
+import json
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from utils.logger import get_logger
+
+CAMPUS_GAZETTEER_PATH = os.getenv(
+    "CAMPUS_GAZETTEER_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "campus_gazetteer.json")
+)
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+logger = get_logger(__name__)
+
+
+def normalize_place(text: str) -> str:
+    """Lowercase, accent-free, single-spaced words"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+@lru_cache(maxsize=1)
+def load_gazetteer() -> Dict[str, Tuple[float, float]]:
+    """Normalized place names and aliases mapped to (latitude, longitude), read once"""
+    try:
+        with open(CAMPUS_GAZETTEER_PATH, encoding="utf-8") as gazetteer_file:
+            entries = json.load(gazetteer_file)
+    except FileNotFoundError:
+        logger.warning("Campus gazetteer not found, event locations will not be geocoded",
+                       extra={"path": CAMPUS_GAZETTEER_PATH})
+        return {}
+
+    places = {}
+    for entry in entries:
+        coordinates = (float(entry["latitude"]), float(entry["longitude"]))
+        for name in [entry["name"], *entry.get("aliases", [])]:
+            key = normalize_place(name)
+            if key:
+                places[key] = coordinates
+    return places
+
+
+def resolve_location(location: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Coordinates of a free-text event location, or None if no campus place matches"""
+    places = load_gazetteer()
+    text = normalize_place(location or "")
+    if not text or not places:
+        return None
+    if text in places:
+        return places[text]
+
+    padded = f" {text} "
+    matches = [name for name in places if f" {name} " in padded]
+    if not matches:
+        return None
+    return places[max(matches, key=len)]
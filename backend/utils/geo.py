@@ -0,0 +1,85 @@
+"""
+Geohash and distance helpers
+Events store the geohash of their coordinates. A geohash prefix is a rectangular
+cell, so "within R km of a point" becomes a few prefix range scans on the
+indexed geohash column (the point's cell and its 8 neighbours, at a precision
+whose cells are at least R wide), followed by an exact distance check.
+"""
+import math
+from typing import List, Tuple
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+GEOHASH_PRECISION = 9
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Geohash of a point, precision characters long"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def cell_size_degrees(precision: int) -> Tuple[float, float]:
+    """(height, width) in degrees of a geohash cell of this precision"""
+    lat_bits = (5 * precision) // 2
+    lon_bits = 5 * precision - lat_bits
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def _clamp_latitude(latitude: float) -> float:
+    return max(-90.0, min(90.0, latitude))
+
+
+def _wrap_longitude(longitude: float) -> float:
+    return (longitude + 180.0) % 360.0 - 180.0
+
+
+def covering_cells(latitude: float, longitude: float, radius_km: float) -> List[str]:
+    """Geohash prefixes whose cells together contain every point within radius_km of a point
+
+    Uses the longest precision whose cells are at least radius_km tall and wide, so
+    the circle fits in the 3x3 block of cells around the point.
+    """
+    # Cells narrow towards the poles, so size them at the circle's most poleward latitude
+    farthest_latitude = min(abs(latitude) + radius_km / KM_PER_DEGREE, 89.9)
+    lat_cos = math.cos(math.radians(farthest_latitude))
+    precision = 1
+    for candidate in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size_degrees(candidate)
+        if height * KM_PER_DEGREE >= radius_km and width * KM_PER_DEGREE * lat_cos >= radius_km:
+            precision = candidate
+            break
+
+    height, width = cell_size_degrees(precision)
+    cells = []
+    for d_lat in (-height, 0.0, height):
+        for d_lon in (-width, 0.0, width):
+            cell = encode_geohash(_clamp_latitude(latitude + d_lat), _wrap_longitude(longitude + d_lon), precision)
+            if cell not in cells:
+                cells.append(cell)
+    return cells
+
+
+def haversine_km(latitude_1: float, longitude_1: float, latitude_2: float, longitude_2: float) -> float:
+    """Great-circle distance between two points in km"""
+    phi_1, phi_2 = math.radians(latitude_1), math.radians(latitude_2)
+    d_phi = phi_2 - phi_1
+    d_lambda = math.radians(longitude_2 - longitude_1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi_1) * math.cos(phi_2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
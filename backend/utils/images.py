@@ -0,0 +1,49 @@
+"""
+Image variant generation
+Uploaded photos are resized into a few fixed widths and transcoded to WebP, so list
+views can download a small thumbnail instead of the original. Resizing is CPU-bound
+and runs in a dedicated process pool.
+"""
+import io
+import os
+from typing import Dict
+
+from PIL import Image, ImageOps
+
+from utils.process_pool import BoundedProcessPool
+
+# Variant name -> longest side in pixels. Images are never upscaled.
+IMAGE_VARIANTS = {
+    "thumbnail": 160,
+    "card": 480,
+    "full": 1600,
+}
+WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", "80"))
+
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", str(min(2, os.cpu_count() or 1))))
+IMAGE_QUEUE_LIMIT = int(os.getenv("IMAGE_QUEUE_LIMIT", "32"))
+
+image_pool = BoundedProcessPool("images", IMAGE_WORKERS, IMAGE_QUEUE_LIMIT)
+
+
+def render_variants(contents: bytes) -> Dict[str, bytes]:
+    """Decode an image and encode every variant as WebP (runs in a worker process)"""
+    with Image.open(io.BytesIO(contents)) as original:
+        # Honour camera orientation before dropping the EXIF data
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+        variants = {}
+        for name, size in IMAGE_VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            resized.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=4)
+            variants[name] = buffer.getvalue()
+        return variants
+
+
+async def generate_variants(contents: bytes) -> Dict[str, bytes]:
+    """Render the WebP variants of an image in the image worker pool"""
+    return await image_pool.run(render_variants, contents)
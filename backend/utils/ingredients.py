@@ -0,0 +1,90 @@
+"""
+Ingredient parsing
+Turns the free-text ingredients of a meal ("200g Tofu, 2 tomatoes; sesame oil")
+into normalized ingredient names ("tofu", "tomatoes", "sesame oil"), and those
+into the terms of the ingredient index: the name with every word made singular,
+plus each run of its words ("sesame oil", "sesame", "oil"). Filter values are
+normalized and made singular the same way and matched against the terms, so
+"Pão" matches "pao", "peanuts" matches "peanut butter" and "crushed peanuts",
+and "peanut butter" matches "crunchy peanut butter".
+"""
+import re
+import unicodedata
+from typing import List, Optional
+
+MAX_INGREDIENT_LENGTH = 100
+
+# Separators between ingredients: commas, semicolons, line breaks and bullets
+_SEPARATORS = re.compile(r"[,;\n\r•·]+|\s+-\s+")
+# Leading amounts and units, e.g. "2", "1/2", "1.5", "200g", "3 cups of", "2 colheres de"
+_QUANTITY = re.compile(
+    r"^(?:\d+(?:[.,/]\d+)?\s*"
+    r"(?:g|kg|mg|ml|l|oz|lb|lbs|cups?|tbsp|tsp|tablespoons?|teaspoons?|colher(?:es)?|x[ií]caras?|pitadas?|"
+    r"dentes?|unidades?|pinch(?:es)?|cloves?|slices?|fatias?)?\.?\s+(?:(?:of|de)\s+)?)+"
+)
+_NON_WORD = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+# Words that never start or end an index term on their own ("of tofu", "salt and")
+_STOPWORDS = {"a", "and", "com", "da", "das", "de", "do", "dos", "e", "em", "in", "o", "of", "or", "the", "with"}
+
+
+def normalize_ingredient(name: str) -> Optional[str]:
+    """Normalize one ingredient name, or None if nothing is left of it"""
+    text = unicodedata.normalize("NFKD", name.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = _QUANTITY.sub("", text.strip() + " ").strip()
+    text = _WHITESPACE.sub(" ", _NON_WORD.sub(" ", text)).strip()
+    if not text or text.isdigit():
+        return None
+    return text[:MAX_INGREDIENT_LENGTH]
+
+
+def parse_ingredients(text: Optional[str]) -> List[str]:
+    """Split a meal's free-text ingredients into unique normalized names, in order"""
+    names = []
+    for part in _SEPARATORS.split(text or ""):
+        name = normalize_ingredient(part)
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def singularize(word: str) -> str:
+    """Light English/Portuguese singular of a normalized word ("tomatoes" -> "tomato", "ovos" -> "ovo")"""
+    if len(word) <= 3 or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "sses", "xes")):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def ingredient_terms(name: str) -> List[str]:
+    """Index terms of a normalized ingredient name: its singular form and every run of its words
+
+    Runs starting or ending with a stopword are left out, so "juice of lemons"
+    gives "juice of lemon", "juice", "lemon" but not "of lemon".
+    """
+    words = [singularize(word) for word in name.split()]
+    terms = []
+    for length in range(len(words), 0, -1):
+        for start in range(len(words) - length + 1):
+            run = words[start:start + length]
+            term = " ".join(run)
+            if run[0] not in _STOPWORDS and run[-1] not in _STOPWORDS and term not in terms:
+                terms.append(term)
+    return terms
+
+
+def normalize_ingredient_filter(values: Optional[List[str]]) -> List[str]:
+    """Normalize ingredient filter values into index terms; each value may itself be comma-separated"""
+    terms = []
+    for value in values or []:
+        for name in parse_ingredients(value):
+            term = " ".join(singularize(word) for word in name.split())
+            if term not in terms:
+                terms.append(term)
+    return terms
@@ -0,0 +1,298 @@
+"""
+Live event updates
+Seat-count changes, updates and deletions of events are pushed to clients over
+Server-Sent Events instead of being polled.
+
+Writers publish with publish_event_change() inside their transaction: it issues a
+Postgres NOTIFY, which is delivered only if the transaction commits. Every API
+worker runs one LiveHub that LISTENs on a dedicated asyncpg connection (opened
+with the first subscriber) and fans each notification out to the in-process
+subscriber queues of that event and of the all-events stream, so clients
+connected to any worker see every change.
+
+Notifications carry only IDs and seat counts (NOTIFY payloads are limited to
+8000 bytes); clients refetch an event to see the rest of an update. Each one
+also carries the writer's transaction ID, so a stream that starts with a
+snapshot skips the changes that snapshot already contains.
+
+Changes committed while the LISTEN connection is down are lost, so streams only
+start once it is listening, and after a reconnect every open stream is sent a
+resync message and closed: EventSource reconnects and starts from fresh state.
+"""
+import asyncio
+import json
+import os
+from typing import Dict, Optional, Set, Tuple
+
+import asyncpg
+from sqlalchemy import Text, cast, func, literal, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.event import EventModel
+from utils.database import USER, PASSWORD, HOST, PORT, DBNAME, sslmode
+from utils.logger import get_logger
+
+LIVE_CHANNEL = "event_changes"
+# Queued messages per subscriber; a slow client loses its oldest messages first
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "100"))
+LIVE_MAX_SUBSCRIBERS = int(os.getenv("LIVE_MAX_SUBSCRIBERS", "1000"))
+LIVE_HEARTBEAT_SECONDS = float(os.getenv("LIVE_HEARTBEAT_SECONDS", "15"))
+# Also how often the LISTEN connection is checked, so a dead one is replaced within about twice this
+LIVE_RECONNECT_SECONDS = float(os.getenv("LIVE_RECONNECT_SECONDS", "5"))
+
+# Kinds of change, sent as the SSE event name
+SEATS = "seats"
+UPDATED = "updated"
+DELETED = "deleted"
+# Sent when changes may have been missed; the client must refetch
+RESYNC = "resync"
+
+# Every event stream
+ALL_EVENTS = None
+
+logger = get_logger(__name__)
+
+
+async def publish_event_change(event_id: str, kind: str, db: AsyncSession) -> None:
+    """Queue a notification with the event's current seat counts; it is sent when the caller commits
+
+    The payload is built by Postgres from the row as this transaction sees it,
+    so it costs a single statement and no extra round-trip of data.
+    """
+    fields = {
+        "type": cast(literal(kind), Text),
+        "eventId": EventModel.id,
+        "xid": cast(func.pg_current_xact_id(), Text),
+        "maxParticipants": EventModel.max_participants,
+        "currentParticipants": EventModel.current_participants,
+        "seatsLeft": func.greatest(EventModel.max_participants - EventModel.current_participants, 0),
+    }
+    # json_build_object takes "any" arguments, so keys are inlined and the bound kind is cast:
+    # Postgres cannot infer the type of an untyped parameter there
+    payload = func.json_build_object(*[
+        part for key, value in fields.items() for part in (literal_column(f"'{key}'"), value)
+    ])
+    await db.execute(
+        select(func.pg_notify(LIVE_CHANNEL, cast(payload, Text))).where(EventModel.id == event_id)
+    )
+
+
+async def read_event_snapshot(event_id: str, db: AsyncSession) -> Optional[Tuple[dict, str]]:
+    """Current state of a live event, with the database snapshot it was read in; None if it is gone"""
+    row = (await db.execute(
+        select(EventModel, cast(func.pg_current_snapshot(), Text))
+        .where(EventModel.id == event_id, EventModel.is_deleted == False)
+    )).first()
+    if row is None:
+        return None
+    event, db_snapshot = row
+    message = {
+        "type": "snapshot",
+        "eventId": str(event.id),
+        "title": event.title,
+        "location": event.location,
+        "eventDate": event.event_date.isoformat(),
+        "price": event.price,
+        "maxParticipants": event.max_participants,
+        "currentParticipants": event.current_participants,
+        "seatsLeft": max(event.max_participants - event.current_participants, 0),
+    }
+    return message, db_snapshot
+
+
+def seen_by_snapshot(xid: Optional[str], db_snapshot: str) -> bool:
+    """Whether a transaction had committed when a snapshot ("xmin:xmax:xip,...") was taken"""
+    if xid is None:
+        return False
+    xmin, xmax, in_progress = db_snapshot.split(":")
+    xid = int(xid)
+    if xid < int(xmin):
+        return True
+    return xid < int(xmax) and str(xid) not in in_progress.split(",")
+
+
+class LiveHub:
+    """Fans out event change notifications to the SSE subscribers of this process"""
+
+    def __init__(self):
+        self.subscribers: Dict[Optional[str], Set[asyncio.Queue]] = {}
+        self.connection: Optional[asyncpg.Connection] = None
+        self._watcher: Optional[asyncio.Task] = None
+        # Set while notifications are being received
+        self.listening = asyncio.Event()
+        # Number of LISTEN connections opened so far
+        self.generation = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self.subscribers.values())
+
+    def subscribe(self, event_id: Optional[str] = ALL_EVENTS) -> asyncio.Queue:
+        """Register a subscriber to one event (or ALL_EVENTS) and return its message queue
+
+        Messages only arrive once listening is set; see wait_listening().
+        """
+        queue = asyncio.Queue(maxsize=LIVE_QUEUE_SIZE)
+        self.subscribers.setdefault(event_id, set()).add(queue)
+        if self._watcher is None:
+            self._watcher = asyncio.create_task(self._keep_listening())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue, event_id: Optional[str] = ALL_EVENTS) -> None:
+        queues = self.subscribers.get(event_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[event_id]
+
+    async def wait_listening(self, timeout: float) -> bool:
+        """Wait up to timeout for the LISTEN connection; returns whether it is up"""
+        try:
+            await asyncio.wait_for(self.listening.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _put(self, queue: asyncio.Queue, message: dict) -> None:
+        if queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(message)
+        self.delivered += 1
+
+    def dispatch(self, message: dict) -> None:
+        """Hand a change to the subscribers of its event and of every event"""
+        targets = self.subscribers.get(message.get("eventId"), set()) | self.subscribers.get(ALL_EVENTS, set())
+        for queue in targets:
+            self._put(queue, message)
+
+    def broadcast(self, message: dict) -> None:
+        """Hand a message to every subscriber"""
+        for queues in self.subscribers.values():
+            for queue in queues:
+                self._put(queue, message)
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        try:
+            self.dispatch(json.loads(payload))
+        except ValueError:
+            logger.warning("Ignoring malformed live notification", extra={"payload": payload[:200]})
+
+    async def _connect(self) -> None:
+        self.connection = await asyncpg.connect(
+            user=USER, password=PASSWORD, host=HOST, port=int(PORT), database=DBNAME, ssl=sslmode
+        )
+        await self.connection.add_listener(LIVE_CHANNEL, self._on_notification)
+
+    async def _close(self) -> None:
+        if self.connection is not None and not self.connection.is_closed():
+            self.connection.terminate()
+        self.connection = None
+
+    async def _keep_listening(self) -> None:
+        """Hold a LISTEN connection open, checking it every LIVE_RECONNECT_SECONDS and reconnecting when it is lost"""
+        while True:
+            try:
+                await self._connect()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Live updates listener could not connect, retrying")
+                await self._close()
+                await asyncio.sleep(LIVE_RECONNECT_SECONDS)
+                continue
+
+            self.generation += 1
+            if self.generation > 1:
+                # Changes committed while disconnected were missed; open streams must start over
+                self.broadcast({"type": RESYNC, "generation": self.generation})
+            self.listening.set()
+            logger.info("Listening for live event changes", extra={"generation": self.generation})
+
+            while True:
+                await asyncio.sleep(LIVE_RECONNECT_SECONDS)
+                try:
+                    await asyncio.wait_for(self.connection.fetchval("SELECT 1"), LIVE_RECONNECT_SECONDS)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.warning("Live updates listener lost its connection, reconnecting")
+                    break
+            self.listening.clear()
+            await self._close()
+
+    async def stop(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+        self.listening.clear()
+        if self.connection is not None and not self.connection.is_closed():
+            await self.connection.close()
+        self.connection = None
+
+    def stats(self) -> dict:
+        return {
+            "listening": self.listening.is_set(),
+            "generation": self.generation,
+            "subscribers": self.subscriber_count,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+live_hub = LiveHub()
+
+
+def format_sse(message: dict) -> str:
+    """Render a change as a Server-Sent Events message"""
+    return f"event: {message.get('type', 'message')}\ndata: {json.dumps(message, default=str)}\n\n"
+
+
+async def event_stream(request, event_id: Optional[str] = ALL_EVENTS, load_snapshot=None):
+    """Yield SSE messages for one event (or every event) until the client disconnects
+
+    load_snapshot, for a single event, is an async callable returning
+    read_event_snapshot()'s result. It runs once the hub is listening, so no
+    change committed meanwhile is missed, and changes it already contains are
+    skipped. A comment line is sent when nothing happened for
+    LIVE_HEARTBEAT_SECONDS, which keeps proxies from closing the connection. The
+    stream ends after a resync (the client reconnects for fresh state) and, for
+    a single event, after its deletion.
+    """
+    queue = live_hub.subscribe(event_id)
+    try:
+        while not await live_hub.wait_listening(LIVE_HEARTBEAT_SECONDS):
+            if await request.is_disconnected():
+                return
+            yield ": keepalive\n\n"
+        # A resync of this connection or an earlier one is already covered by what comes next
+        generation = live_hub.generation
+
+        db_snapshot = None
+        if load_snapshot is not None:
+            state = await load_snapshot()
+            if state is None:
+                yield format_sse({"type": DELETED, "eventId": event_id})
+                return
+            snapshot, db_snapshot = state
+            yield format_sse(snapshot)
+        while not await request.is_disconnected():
+            try:
+                message = await asyncio.wait_for(queue.get(), LIVE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if message.get("type") == RESYNC:
+                if message["generation"] <= generation:
+                    continue
+                yield format_sse(message)
+                break
+            if db_snapshot is not None and seen_by_snapshot(message.get("xid"), db_snapshot):
+                continue
+            yield format_sse(message)
+            if event_id is not ALL_EVENTS and message.get("type") == DELETED:
+                break
+    finally:
+        live_hub.unsubscribe(queue, event_id)
@@ -0,0 +1,165 @@
+"""
+Structured logging
+Log records are handed to a queue and written by a background listener thread, so
+request handlers never block on stdout. Records are rendered as JSON lines (or plain
+text with LOG_FORMAT=text) and carry the ID of the request that emitted them.
+"""
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+# Fraction of successful requests that get an access log line, overridable per route,
+# e.g. LOG_SAMPLE_RATES="GET /events/=0.1,GET /health/db=0"
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+# Errors and slow requests are always logged, whatever the sample rate
+LOG_SLOW_REQUEST_MS = float(os.getenv("LOG_SLOW_REQUEST_MS", "1000"))
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the current request ID (runs in the emitting task, before queueing)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Render a record, including its `extra` fields, as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """Queue records with their fields intact, for the listener-side formatter
+
+    The stock prepare() formats the record and folds its traceback into the
+    message; here only the message arguments are merged and the traceback is
+    rendered to exc_text, so JsonFormatter still sees it as a separate field.
+    """
+
+    _traceback_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or self._traceback_formatter.formatException(record.exc_info)
+            # Tracebacks hold frames alive; only their text is needed from here on
+            record.exc_info = None
+        return record
+
+
+def setup_logging() -> None:
+    """Route all logging through a non-blocking queue handler (safe to call more than once)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+
+    # Let uvicorn's own loggers go through the same pipeline
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+    # Access lines are written by our request middleware instead
+    logging.getLogger("uvicorn.access").disabled = True
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(name)
+
+
+def _parse_sample_rates(spec: str) -> Dict[str, float]:
+    rates = {}
+    for item in spec.split(","):
+        if "=" in item:
+            route, rate = item.rsplit("=", 1)
+            rates[route.strip()] = float(rate)
+    return rates
+
+
+_sample_rates = _parse_sample_rates(LOG_SAMPLE_RATES)
+_sample_counters: Dict[str, float] = {}
+
+
+def should_log_request(route_key: str, status_code: int, latency_ms: float) -> bool:
+    """Decide whether a request gets an access log line
+
+    Failures and slow requests are always logged. Other requests are sampled
+    deterministically at the route's rate (e.g. 0.1 logs every tenth request).
+    """
+    if status_code >= 400 or latency_ms >= LOG_SLOW_REQUEST_MS:
+        return True
+
+    rate = _sample_rates.get(route_key, LOG_SAMPLE_RATE)
+    if rate >= 1:
+        return True
+    if rate <= 0:
+        return False
+
+    credit = _sample_counters.get(route_key, 0.0) + rate
+    if credit >= 1:
+        _sample_counters[route_key] = credit - 1
+        return True
+    _sample_counters[route_key] = credit
+    return False
@@ -0,0 +1,92 @@
+"""
+Prometheus metrics
+Per-route request counters and latency histograms, in-flight requests, connection
+and worker pool gauges, and storage upload timings, served as text on GET /metrics.
+Metrics are per process; scrape each worker, or run a single worker per container.
+"""
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+# Requests that matched no route share one label value, so random paths cannot blow up cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code",
+    ["method", "route", "status"],
+    registry=REGISTRY,
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method and route template",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    registry=REGISTRY,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+    registry=REGISTRY,
+)
+STORAGE_UPLOAD_DURATION = Histogram(
+    "storage_upload_duration_seconds",
+    "Time spent uploading one object to storage, by bucket",
+    ["bucket"],
+    buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    registry=REGISTRY,
+)
+
+
+def observe_request(method: str, route: str, status_code: int, duration_seconds: float) -> None:
+    HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+    HTTP_REQUEST_DURATION.labels(method, route).observe(duration_seconds)
+
+
+class PoolCollector:
+    """Reads database and worker pool statistics at scrape time"""
+
+    def collect(self):
+        from utils.database import get_pool_stats
+        from utils.images import image_pool
+        from utils.password import password_pool
+
+        db = get_pool_stats()
+        for key, help_text in [
+            ("pool_size", "Configured size of the database connection pool"),
+            ("checked_out", "Database connections currently checked out"),
+            ("idle", "Idle database connections in the pool"),
+            ("overflow", "Database connections open beyond the pool size"),
+        ]:
+            yield GaugeMetricFamily(f"db_pool_{key}", help_text, value=db[key])
+        yield CounterMetricFamily("db_pool_checkouts", "Connections handed out to requests", value=db["checkouts"])
+        yield CounterMetricFamily(
+            "db_pool_wait_seconds", "Time requests spent waiting for a connection", value=db["wait_seconds_total"]
+        )
+
+        in_flight = GaugeMetricFamily("worker_pool_in_flight", "Tasks running in a worker pool", labels=["pool"])
+        queued = GaugeMetricFamily("worker_pool_queue_depth", "Tasks waiting for a worker", labels=["pool"])
+        rejected = CounterMetricFamily("worker_pool_rejected", "Tasks rejected by backpressure", labels=["pool"])
+        waited = CounterMetricFamily("worker_pool_wait_seconds", "Time tasks spent waiting for a worker", labels=["pool"])
+        for pool in (password_pool, image_pool):
+            stats = pool.stats()
+            in_flight.add_metric([pool.name], stats["in_flight"])
+            queued.add_metric([pool.name], stats["queue_depth"])
+            rejected.add_metric([pool.name], stats["rejected"])
+            waited.add_metric([pool.name], stats["wait_seconds_total"])
+        yield from (in_flight, queued, rejected, waited)
+
+    def describe(self):
+        # Nothing to describe up front; collecting at registration would touch the pools too early
+        return []
+
+
+REGISTRY.register(PoolCollector())
+
+
+def render_metrics() -> bytes:
+    return generate_latest(REGISTRY)
+
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
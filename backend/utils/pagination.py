@@ -0,0 +1,41 @@
+"""
+Keyset pagination helpers
+Cursors are opaque, URL-safe tokens wrapping the sort key of the last row of a page
+"""
+import base64
+import json
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last returned row into an opaque cursor"""
+    raw = json.dumps(list(values), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decode a cursor produced by encode_cursor, validating the number of key parts"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def split_page(rows: List[Any], limit: int) -> Tuple[List[Any], bool]:
+    """Split a result fetched with limit + 1 rows into the page and a has-more flag"""
+    return rows[:limit], len(rows) > limit
+
+
+def set_next_cursor(response, next_cursor: Optional[str]) -> None:
+    """Expose the next page cursor on the response, if there is one"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
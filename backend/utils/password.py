@@ -4,6 +4,9 @@ from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
 import os
 from dotenv import load_dotenv
+
+from utils.process_pool import BoundedProcessPool
+
 load_dotenv()
 
 
@@ -11,6 +14,12 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# bcrypt burns ~250 ms of CPU per call, so it runs in a dedicated, size-bounded process pool
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(2, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "64"))
+
+password_pool = BoundedProcessPool("password", PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT)
+
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
     password_bytes = password.encode('utf-8')
@@ -24,6 +33,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     hashed_bytes = hashed_password.encode('utf-8')
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the password worker pool without blocking the event loop"""
+    return await password_pool.run(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the password worker pool without blocking the event loop"""
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     """Create JWT access token"""
     to_encode = data.copy()
@@ -36,13 +53,16 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str):
-    """Verify and decode JWT token"""
+def decode_token(token: str) -> dict:
+    """Verify a JWT token and return its payload, which always carries a userId"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("userId")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        return user_id
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    if payload.get("userId") is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return payload
+
+def verify_token(token: str):
+    """Verify and decode JWT token"""
+    return decode_token(token)["userId"]
@@ -0,0 +1,96 @@
+"""
+Bounded process pool for CPU-bound work
+Keeps heavy CPU work (bcrypt, image processing) off the event loop, applies
+backpressure once too much work is queued and records queue metrics
+"""
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException
+
+
+class BoundedProcessPool:
+    """A lazily started ProcessPoolExecutor with a queue limit and wait-time metrics
+
+    At most max_workers tasks run at once; up to queue_limit more may wait for a
+    free worker. Anything beyond that is rejected with a 503 instead of piling up.
+    """
+
+    def __init__(self, name: str, max_workers: int, queue_limit: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self._queued = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn so workers never inherit the parent's event loop or open DB connections
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) in a worker process, waiting for a free worker if needed"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+        if self._queued >= self.queue_limit and self._slots.locked():
+            self._rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy, please try again shortly",
+                headers={"Retry-After": "1"}
+            )
+
+        self._queued += 1
+        enqueued_at = time.perf_counter()
+        try:
+            await self._slots.acquire()
+        finally:
+            self._queued -= 1
+
+        waited = time.perf_counter() - enqueued_at
+        self._wait_seconds_total += waited
+        self._wait_seconds_max = max(self._wait_seconds_max, waited)
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._in_flight -= 1
+            self._completed += 1
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, worker usage and wait-time metrics"""
+        return {
+            "name": self.name,
+            "max_workers": self.max_workers,
+            "queue_limit": self.queue_limit,
+            "in_flight": self._in_flight,
+            "queue_depth": self._queued,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "wait_seconds_total": round(self._wait_seconds_total, 6),
+            "wait_seconds_max": round(self._wait_seconds_max, 6),
+            "wait_seconds_avg": round(self._wait_seconds_total / self._completed, 6) if self._completed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, if they were ever started"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
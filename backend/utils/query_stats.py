@@ -0,0 +1,102 @@
+"""
+Per-request SQL statistics
+Engine event hooks count the statements a request runs and the time spent in them.
+The request middleware reports the totals in X-DB-Query-Count / X-DB-Time-Ms headers
+and the access log, and warns when one statement shape repeats suspiciously often
+within a single request (the usual sign of an N+1 query).
+"""
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from utils.logger import get_logger
+
+# Warn when the same statement runs more than this many times in one request; 0 disables it
+DB_REPEATED_QUERY_THRESHOLD = int(os.getenv("DB_REPEATED_QUERY_THRESHOLD", "10"))
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Time-Ms"
+
+logger = get_logger(__name__)
+
+
+class QueryStats:
+    """Statements run while serving one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+
+    @property
+    def time_ms(self) -> float:
+        return round(self.seconds * 1000, 2)
+
+    def repeated(self, threshold: int = DB_REPEATED_QUERY_THRESHOLD):
+        """Statement shapes that ran more than threshold times, most frequent first"""
+        if threshold <= 0:
+            return []
+        return [(statement, count) for statement, count in self.statements.most_common() if count > threshold]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def start_query_stats():
+    """Begin collecting statistics for the current request; returns a token for finish_query_stats"""
+    return _current_stats.set(QueryStats())
+
+
+def finish_query_stats(token) -> QueryStats:
+    """Stop collecting and return what the request ran"""
+    stats = _current_stats.get()
+    _current_stats.reset(token)
+    return stats
+
+
+def warn_repeated_queries(stats: QueryStats, route: Optional[str], request_id: Optional[str] = None) -> None:
+    """Log one warning per statement shape that crossed DB_REPEATED_QUERY_THRESHOLD"""
+    for statement, count in stats.repeated():
+        logger.warning(
+            "Statement repeated within one request",
+            extra={
+                "request_id": request_id,
+                "route": route,
+                "count": count,
+                "statement": " ".join(statement.split())[:500],
+            }
+        )
+
+
+# Hooks are registered on the Engine class so every engine (API, scripts, tests) is covered;
+# outside a request there are no stats to update and they return immediately
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    started = conn.info.get("query_started")
+    if started:
+        stats.seconds += time.perf_counter() - started.pop()
+    stats.count += 1
+    # Bound parameters are kept out of the statement text, so equal text means equal shape
+    stats.statements[statement] += 1
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
@@ -0,0 +1,291 @@
+"""
+HTTP response cache for public reads
+Cached routes answer from a bounded in-memory LRU, or from Redis when
+RESPONSE_CACHE_REDIS_URL is set, so every API worker shares one cache. Every
+response gets a strong ETag, and a matching If-None-Match is answered with 304.
+
+Entries are tagged ("events", "feed", "event:<id>", "meal:<id>", "user:<id>") and record
+the version of each tag when they were stored. Service write paths call
+invalidate() after committing, which bumps the versions of the tags they touched,
+so stale entries are never served again. The TTL only bounds memory use.
+
+With the in-memory backend each worker invalidates only its own cache, so use
+Redis when running several workers.
+"""
+import base64
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+
+from fastapi import Request
+from fastapi.routing import APIRoute
+from starlette.responses import Response
+
+from utils.cache import TTLCache
+from utils.database import READ_ROUTE_SCOPE_KEY, REPLICA, REPLICA_MAX_LAG_SECONDS, STICKY, choose_read_route
+from utils.logger import get_logger
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "5000"))
+# 0 stops storing responses; ETags and 304s still work
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+RESPONSE_CACHE_REDIS_URL = os.getenv("RESPONSE_CACHE_REDIS_URL", "")
+
+# Response headers kept with a cached body
+_STORED_HEADERS = ("content-type", "x-next-cursor")
+
+logger = get_logger(__name__)
+
+# Tags of cached responses, shared by the routers (reads) and services (writes)
+EVENTS_TAG = "events"
+# Event cards also change with their meal's title and their host's picture
+FEED_TAG = "feed"
+
+
+def event_tag(event_id: str) -> str:
+    return f"event:{event_id}"
+
+
+def meal_tag(meal_id: str) -> str:
+    return f"meal:{meal_id}"
+
+
+def user_tag(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+class MemoryBackend:
+    """Entries and tag versions held by this process"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.ttl = ttl
+        self.entries = TTLCache(maxsize, ttl)
+        # tag -> (version, bumped at), oldest bump first
+        self.versions: OrderedDict = OrderedDict()
+        self._next_version = 0
+
+    async def get(self, key: str) -> Optional[dict]:
+        return self.entries.get(key)
+
+    async def set(self, key: str, entry: dict) -> None:
+        self.entries.set(key, entry)
+
+    async def versions_of(self, tags: List[str]) -> Dict[str, int]:
+        return {tag: self.versions.get(tag, (0, 0.0))[0] for tag in tags}
+
+    async def clock(self) -> int:
+        """Version given to the latest bump; every later bump gets a higher one"""
+        return self._next_version
+
+    async def bump(self, tags: Iterable[str]) -> None:
+        now = time.monotonic()
+        for tag in tags:
+            self._next_version += 1
+            self.versions[tag] = (self._next_version, now)
+            self.versions.move_to_end(tag)
+        # A tag bumped more than a TTL ago has outlived every entry stored before that bump,
+        # so forgetting it (back to version 0) cannot revive a stale entry
+        while self.versions:
+            _, (_, bumped_at) = next(iter(self.versions.items()))
+            if bumped_at > now - self.ttl:
+                break
+            self.versions.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"backend": "memory", **self.entries.stats(), "tracked_tags": len(self.versions)}
+
+
+class RedisBackend:
+    """Entries and tag versions shared by every worker through Redis"""
+
+    def __init__(self, url: str, ttl: float):
+        # Optional dependency, only needed when a Redis URL is configured
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[dict]:
+        raw = await self.client.get(f"response-cache:entry:{key}")
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry = json.loads(raw)
+        entry["body"] = base64.b64decode(entry["body"])
+        return entry
+
+    async def set(self, key: str, entry: dict) -> None:
+        raw = json.dumps({**entry, "body": base64.b64encode(entry["body"]).decode("ascii")})
+        await self.client.set(f"response-cache:entry:{key}", raw, ex=max(int(self.ttl), 1))
+
+    async def versions_of(self, tags: List[str]) -> Dict[str, int]:
+        if not tags:
+            return {}
+        values = await self.client.mget([f"response-cache:tag:{tag}" for tag in tags])
+        return {tag: int(value or 0) for tag, value in zip(tags, values)}
+
+    async def clock(self) -> int:
+        """Version given to the latest bump; every later bump gets a higher one"""
+        return int(await self.client.get("response-cache:clock") or 0)
+
+    async def bump(self, tags: Iterable[str]) -> None:
+        # Versions come from one never-expiring counter, so a tag that expired and is bumped
+        # again can never reuse an old version. Tags outlive the entries stored before the
+        # bump (see MemoryBackend.bump).
+        version = await self.client.incr("response-cache:clock")
+        async with self.client.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.set(f"response-cache:tag:{tag}", version, ex=max(int(self.ttl * 2), 1))
+            await pipe.execute()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_backend = None
+
+
+def get_backend():
+    """Return the configured cache backend"""
+    global _backend
+    if _backend is None:
+        if RESPONSE_CACHE_REDIS_URL:
+            _backend = RedisBackend(RESPONSE_CACHE_REDIS_URL, RESPONSE_CACHE_TTL_SECONDS)
+        else:
+            _backend = MemoryBackend(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SECONDS)
+    return _backend
+
+
+async def invalidate(*tags: str) -> None:
+    """Make every cached response carrying one of these tags stale; call after committing a write"""
+    try:
+        await get_backend().bump(tags)
+    except Exception:
+        logger.exception("Response cache invalidation failed", extra={"tags": list(tags)})
+
+
+def get_response_cache_stats() -> dict:
+    return get_backend().stats()
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _cache_key(request: Request) -> str:
+    query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+def _respond(request: Request, entry: dict, status: str) -> Response:
+    headers = {**entry["headers"], "ETag": entry["etag"], "Cache-Control": "no-cache", "X-Cache": status}
+    if etag_matches(request, entry["etag"]):
+        headers.pop("content-type", None)
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry["body"], headers=headers)
+
+
+async def _is_fresh(entry: dict) -> bool:
+    current = await get_backend().versions_of(list(entry["versions"]))
+    return current == entry["versions"]
+
+
+async def _usable_by(request: Request, entry: dict) -> bool:
+    """Whether an entry filled from the read replica may answer this request
+
+    Such an entry can miss writes the replica had not replayed yet, so it is
+    refilled after DB_REPLICA_MAX_LAG_SECONDS, and users who just wrote skip it.
+    """
+    replica_until = entry.get("replica_until")
+    if replica_until is None:
+        return True
+    return time.time() < replica_until and await choose_read_route(request) != STICKY
+
+
+def cache_response(tags: Callable[[dict, Optional[dict]], List[str]]):
+    """Mark a GET endpoint as cacheable (routers must use CachedRoute)
+
+    tags(path_params, payload) names the tags of a response. It is called with
+    payload=None before the endpoint runs and with the decoded JSON body after, so
+    tags that depend on the response (e.g. the meal of an event) can be added.
+    """
+    def decorator(endpoint):
+        endpoint.response_cache_tags = tags
+        return endpoint
+    return decorator
+
+
+class CachedRoute(APIRoute):
+    """Route class serving endpoints marked with @cache_response through the response cache"""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        tags_for = getattr(self.endpoint, "response_cache_tags", None)
+        if tags_for is None:
+            return handler
+
+        async def cached_handler(request: Request) -> Response:
+            if request.method != "GET":
+                return await handler(request)
+
+            backend = get_backend()
+            key = _cache_key(request)
+            try:
+                entry = await backend.get(key)
+                if entry is not None and await _is_fresh(entry) and await _usable_by(request, entry):
+                    return _respond(request, entry, "HIT")
+                # Versions are read before the endpoint runs, so a write racing with it
+                # leaves the stored entry already stale rather than wrongly fresh
+                versions = await backend.versions_of(tags_for(request.path_params, None))
+                # Tags known only from the response can't be read in advance; any of
+                # them bumped after this point means the endpoint may have read old data
+                started_at = await backend.clock()
+            except Exception:
+                logger.exception("Response cache lookup failed")
+                return await handler(request)
+
+            response = await handler(request)
+            body = getattr(response, "body", None)
+            if response.status_code != 200 or body is None:
+                return response
+
+            entry = {
+                "body": body,
+                "etag": make_etag(body),
+                "headers": {name: response.headers[name] for name in _STORED_HEADERS if name in response.headers},
+                "versions": versions,
+            }
+            if request.scope.get(READ_ROUTE_SCOPE_KEY) == REPLICA:
+                entry["replica_until"] = time.time() + REPLICA_MAX_LAG_SECONDS
+            try:
+                extra_tags = [tag for tag in tags_for(request.path_params, json.loads(body)) if tag not in versions]
+                extra_versions = await backend.versions_of(extra_tags)
+                entry["versions"] = {**versions, **extra_versions}
+                raced = any(version > started_at for version in extra_versions.values())
+                if RESPONSE_CACHE_TTL_SECONDS > 0 and not raced:
+                    await backend.set(key, entry)
+            except Exception:
+                logger.exception("Response cache store failed")
+            return _respond(request, entry, "MISS")
+
+        return cached_handler
@@ -0,0 +1,79 @@
+"""
+Object storage backends
+Supabase Storage in production, or a local filesystem stand-in for development and testing
+(STORAGE_BACKEND=local). upload and remove are blocking; call them through utils.uploads,
+which runs them off the event loop. public_url only builds a string.
+"""
+import os
+from pathlib import Path
+from typing import List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase")
+LOCAL_STORAGE_DIR = os.getenv("LOCAL_STORAGE_DIR", "storage")
+LOCAL_STORAGE_BASE_URL = os.getenv("LOCAL_STORAGE_BASE_URL", "http://localhost:8000/storage")
+
+
+class SupabaseStorage:
+    """Supabase Storage buckets"""
+
+    def __init__(self):
+        # Imported lazily so the local backend works without Supabase credentials
+        from utils.supabase import supabase
+        self.client = supabase
+
+    def upload(self, bucket: str, name: str, data: bytes, content_type: str) -> None:
+        self.client.storage.from_(bucket).upload(name, data, {"content-type": content_type})
+
+    def public_url(self, bucket: str, name: str) -> str:
+        return self.client.storage.from_(bucket).get_public_url(name)
+
+    def remove(self, bucket: str, names: List[str]) -> None:
+        self.client.storage.from_(bucket).remove(names)
+
+
+class LocalStorage:
+    """Buckets as directories under LOCAL_STORAGE_DIR, served by the app under /storage"""
+
+    def __init__(self, root: str = LOCAL_STORAGE_DIR, base_url: str = LOCAL_STORAGE_BASE_URL):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+
+    def _path(self, bucket: str, name: str) -> Path:
+        path = (self.root / bucket / name).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError("Invalid object name")
+        return path
+
+    def upload(self, bucket: str, name: str, data: bytes, content_type: str) -> None:
+        path = self._path(bucket, name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    def public_url(self, bucket: str, name: str) -> str:
+        return f"{self.base_url}/{bucket}/{name}"
+
+    def remove(self, bucket: str, names: List[str]) -> None:
+        for name in names:
+            self._path(bucket, name).unlink(missing_ok=True)
+
+
+_storage = None
+
+
+def get_storage():
+    """Return the configured storage backend"""
+    global _storage
+    if _storage is None:
+        _storage = LocalStorage() if STORAGE_BACKEND == "local" else SupabaseStorage()
+    return _storage
+
+
+def object_name_from_url(url: str, bucket: str) -> Optional[str]:
+    """Extract the object name from a public URL of the given bucket"""
+    marker = f"{bucket}/"
+    if not url or marker not in url:
+        return None
+    return url.split(marker)[-1].split("?")[0]
@@ -0,0 +1,146 @@
+"""
+Image upload helper shared by events, meals and profile pictures
+Uploads are read in chunks and rejected as soon as they cross the size limit,
+resized into WebP variants, and stored through the threadpool so storage calls
+never block the event loop
+"""
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from utils.images import generate_variants
+from utils.metrics import STORAGE_UPLOAD_DURATION
+from utils.storage import get_storage, object_name_from_url
+
+MAX_UPLOAD_BYTES = 5 * 1024 * 1024  # 5MB
+UPLOAD_CHUNK_BYTES = 64 * 1024
+# Room for the other form fields sent alongside the file
+MAX_UPLOAD_REQUEST_BYTES = MAX_UPLOAD_BYTES + 256 * 1024
+
+
+async def read_upload(image: UploadFile, too_large_detail: str, max_bytes: int = MAX_UPLOAD_BYTES) -> bytes:
+    """Read an uploaded file chunk by chunk, failing as soon as it crosses max_bytes"""
+    if image.size is not None and image.size > max_bytes:
+        raise HTTPException(status_code=400, detail=too_large_detail)
+
+    contents = bytearray()
+    while True:
+        chunk = await image.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        contents.extend(chunk)
+        if len(contents) > max_bytes:
+            raise HTTPException(status_code=400, detail=too_large_detail)
+    return bytes(contents)
+
+
+async def _timed_upload(storage, bucket: str, name: str, data: bytes, content_type: str) -> None:
+    start = time.perf_counter()
+    try:
+        await run_in_threadpool(storage.upload, bucket, name, data, content_type)
+    finally:
+        STORAGE_UPLOAD_DURATION.labels(bucket).observe(time.perf_counter() - start)
+
+
+async def upload_image(
+    image: UploadFile,
+    bucket: str,
+    allowed_types: List[str],
+    invalid_type_detail: str,
+    too_large_detail: str,
+    filename_prefix: str = ""
+) -> Tuple[str, Dict[str, str]]:
+    """Validate an uploaded image and store it with its resized WebP variants
+
+    Returns the public URL of the original and a mapping of variant name
+    (thumbnail, card, full) to public URL.
+    """
+    if image.content_type not in allowed_types:
+        raise HTTPException(status_code=400, detail=invalid_type_detail)
+
+    contents = await read_upload(image, too_large_detail)
+
+    try:
+        rendered = await generate_variants(contents)
+    except HTTPException:
+        raise
+    except Exception:
+        # The declared content type was allowed but the bytes are not a decodable image
+        raise HTTPException(status_code=400, detail=invalid_type_detail)
+
+    # Generate unique filename
+    file_extension = image.filename.split('.')[-1] if image.filename else 'jpg'
+    stem = f"{filename_prefix}{uuid.uuid4()}_{int(datetime.now().timestamp())}"
+    original_name = f"{stem}.{file_extension}"
+    variant_names = {variant: f"{stem}_{variant}.webp" for variant in rendered}
+
+    storage = get_storage()
+    await asyncio.gather(
+        _timed_upload(storage, bucket, original_name, contents, image.content_type),
+        *(
+            _timed_upload(storage, bucket, name, rendered[variant], "image/webp")
+            for variant, name in variant_names.items()
+        )
+    )
+
+    variant_urls = {variant: storage.public_url(bucket, name) for variant, name in variant_names.items()}
+    return storage.public_url(bucket, original_name), variant_urls
+
+
+async def delete_image(url: str, bucket: str, variants: Optional[Dict[str, str]] = None) -> None:
+    """Delete a previously uploaded image and its variants given their public URLs"""
+    urls = [url, *(variants or {}).values()]
+    names = [name for name in (object_name_from_url(u, bucket) for u in urls) if name]
+    if names:
+        await run_in_threadpool(get_storage().remove, bucket, names)
+
+
+class UploadSizeLimitMiddleware:
+    """Reject multipart request bodies larger than max_bytes while they are still streaming in
+
+    Without this, Starlette spools the whole upload to disk before the route even runs.
+    """
+
+    def __init__(self, app, max_bytes: int = MAX_UPLOAD_REQUEST_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            return await self.app(scope, receive, send)
+
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            return await self._reject(send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise HTTPException(status_code=413, detail="File size exceeds 5MB limit.")
+            return message
+
+        return await self.app(scope, limited_receive, send)
+
+    async def _reject(self, send):
+        body = json.dumps({"detail": "File size exceeds 5MB limit."}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
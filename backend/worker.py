@@ -0,0 +1,118 @@
+"""
+Background job worker
+Runs the jobs enqueued by the API (see services/job_service.py). Start one or more:
+
+    python worker.py
+
+Each worker polls for due jobs of every registered type, runs up to
+JOB_WORKER_CONCURRENCY of them at a time, and records the outcome. Stop it with
+Ctrl+C or SIGTERM; running jobs are given JOB_SHUTDOWN_GRACE_SECONDS to finish,
+and unfinished ones are picked up again after their lease expires.
+"""
+import asyncio
+import os
+import signal
+import socket
+import time
+import traceback
+import uuid
+
+from services import job_handlers  # noqa: F401 - registers the job handlers
+from services.job_service import (
+    DEAD,
+    JOB_LEASE_SECONDS,
+    JOB_TYPES,
+    claim_jobs,
+    complete_job,
+    fail_job,
+    purge_finished_jobs,
+)
+from utils.database import AsyncSessionLocal, async_engine
+from utils.logger import setup_logging, shutdown_logging, get_logger
+
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "8"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+JOB_SHUTDOWN_GRACE_SECONDS = float(os.getenv("JOB_SHUTDOWN_GRACE_SECONDS", "30"))
+# Handlers are cut off before their lease runs out, so no other worker starts them concurrently
+JOB_TIMEOUT_SECONDS = JOB_LEASE_SECONDS * 0.8
+PURGE_INTERVAL_SECONDS = 3600
+
+logger = get_logger("worker")
+
+
+async def run_job(job, worker_id: str) -> None:
+    """Run one claimed job and record its outcome"""
+    started = time.perf_counter()
+    extra = {"job_id": job.id, "job_type": job.job_type, "attempt": job.attempts}
+    try:
+        await asyncio.wait_for(JOB_TYPES[job.job_type].handler(job.payload), JOB_TIMEOUT_SECONDS)
+    except Exception as e:
+        error = "".join(traceback.format_exception_only(type(e), e)).strip() or type(e).__name__
+        async with AsyncSessionLocal() as db:
+            status = await fail_job(job, worker_id, error, db)
+        log = logger.error if status == DEAD else logger.warning
+        log("Job failed", extra={**extra, "status": status, "error": error})
+        return
+
+    async with AsyncSessionLocal() as db:
+        await complete_job(job.id, worker_id, db)
+    logger.info("Job done", extra={**extra, "duration_ms": round((time.perf_counter() - started) * 1000, 2)})
+
+
+async def work(stop: asyncio.Event) -> None:
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    logger.info("Worker started", extra={"worker_id": worker_id, "job_types": sorted(JOB_TYPES)})
+    running = set()
+    last_purge = 0.0
+
+    while not stop.is_set():
+        for job_type in JOB_TYPES:
+            free = JOB_WORKER_CONCURRENCY - len(running)
+            if free <= 0:
+                break
+            try:
+                async with AsyncSessionLocal() as db:
+                    jobs = await claim_jobs(job_type, worker_id, db, free)
+            except Exception:
+                logger.exception("Claiming jobs failed", extra={"job_type": job_type})
+                continue
+            for job in jobs:
+                task = asyncio.create_task(run_job(job, worker_id))
+                running.add(task)
+                task.add_done_callback(running.discard)
+
+        if time.monotonic() - last_purge > PURGE_INTERVAL_SECONDS:
+            last_purge = time.monotonic()
+            try:
+                async with AsyncSessionLocal() as db:
+                    purged = await purge_finished_jobs(db)
+                if purged:
+                    logger.info("Purged finished jobs", extra={"count": purged})
+            except Exception:
+                logger.exception("Purging finished jobs failed")
+
+        try:
+            await asyncio.wait_for(stop.wait(), JOB_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+    if running:
+        logger.info("Waiting for running jobs", extra={"count": len(running)})
+        await asyncio.wait(running, timeout=JOB_SHUTDOWN_GRACE_SECONDS)
+
+
+async def main() -> None:
+    setup_logging()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await work(stop)
+    finally:
+        await async_engine.dispose()
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
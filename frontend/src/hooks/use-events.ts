@@ -1,4 +1,4 @@
-import { useState, useCallback } from "react";
+import { useState, useCallback, useRef } from "react";
 import { getEvents, getMyEvents, getJoinedEvents, joinEvent as joinEventApi } from "@/services";
 import { Event } from "@/types";
 import { useToast } from "@/hooks/use-toast";
@@ -9,8 +9,11 @@ interface UseEventsReturn {
   myEvents: Event[];
   joinedEvents: Event[];
   loading: boolean;
+  loadingMore: boolean;
+  hasMoreEvents: boolean;
   error: Error | null;
   loadAllEvents: () => Promise<void>;
+  loadMoreEvents: () => Promise<void>;
   loadMyEvents: () => Promise<void>;
   loadJoinedEvents: () => Promise<void>;
   joinEvent: (eventId: string) => Promise<void>;
@@ -22,15 +25,22 @@ export function useEvents(): UseEventsReturn {
   const [myEvents, setMyEvents] = useState<Event[]>([]);
   const [joinedEvents, setJoinedEvents] = useState<Event[]>([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | undefined>();
   const [error, setError] = useState<Error | null>(null);
   const { toast } = useToast();
+  // Bumped on every reload, so a "load more" started before it is discarded
+  const listVersion = useRef(0);
 
   const loadAllEvents = useCallback(async () => {
+    const version = ++listVersion.current;
     try {
       setLoading(true);
       setError(null);
-      const events = await getEvents();
-      setAllEvents(events);
+      const page = await getEvents();
+      if (version !== listVersion.current) return;
+      setAllEvents(page.events);
+      setNextCursor(page.nextCursor);
     } catch (err) {
       const error = err instanceof Error ? err : new Error("Failed to load events");
       setError(error);
@@ -46,6 +56,29 @@ export function useEvents(): UseEventsReturn {
     }
   }, [toast]);
 
+  // Appends the next page of events (for the "load more" button)
+  const loadMoreEvents = useCallback(async () => {
+    if (!nextCursor || loadingMore) return;
+    const version = listVersion.current;
+    try {
+      setLoadingMore(true);
+      const page = await getEvents(nextCursor);
+      if (version !== listVersion.current) return;
+      setAllEvents((events) => [...events, ...page.events]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Error loading more events:", err);
+      toast({
+        title: "Error",
+        description: "Failed to load more events. Please try again.",
+        variant: "destructive",
+        duration: 1500,
+      });
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [nextCursor, loadingMore, toast]);
+
   const loadMyEvents = useCallback(async () => {
     try {
       const events = await getMyEvents();
@@ -128,8 +161,11 @@ export function useEvents(): UseEventsReturn {
     myEvents,
     joinedEvents,
     loading,
+    loadingMore,
+    hasMoreEvents: nextCursor !== undefined,
     error,
     loadAllEvents,
+    loadMoreEvents,
     loadMyEvents,
     loadJoinedEvents,
     joinEvent,
@@ -4,6 +4,7 @@ import { Footer } from "@/components/home/Footer";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
 import { useEvents } from "@/hooks/use-events";
 import { EventCard } from "@/components/events/EventCard";
+import { Button } from "@/components/ui/button";
 
 export default function Explore() {
   const [activeTab, setActiveTab] = useState("all");
@@ -13,6 +14,9 @@ export default function Explore() {
     myEvents,
     joinedEvents,
     loading,
+    loadingMore,
+    hasMoreEvents,
+    loadMoreEvents,
     refreshAllData,
     joinEvent: handleJoinEvent,
   } = useEvents();
@@ -92,6 +96,13 @@ export default function Explore() {
                 ))
               )}
             </div>
+            {hasMoreEvents && (
+              <div className="flex justify-center mt-6">
+                <Button variant="outline" onClick={loadMoreEvents} disabled={loadingMore}>
+                  {loadingMore ? "Loading..." : "Load more events"}
+                </Button>
+              </div>
+            )}
           </TabsContent>
 
           <TabsContent value="my">
@@ -1,5 +1,5 @@
 import { httpClient } from "./http-client";
-import { Event, EventCreate, EventUpdate, JoinEventRequest } from "@/types";
+import { Event, EventCreate, EventUpdate, EventPage, JoinEventRequest } from "@/types";
 
 /**
  * Event Service
@@ -16,12 +16,30 @@ export const createEvent = async (eventData: EventCreate | FormData): Promise<Ev
   return response.data;
 };
 
+const EVENTS_PAGE_SIZE = 30;
+
 /**
- * Get all events
+ * Start of the current hour; upcoming events are listed from there, and the
+ * request URL stays the same for an hour so the API can serve it from cache
  */
-export const getEvents = async (): Promise<Event[]> => {
-  const response = await httpClient.get("/events/");
-  return response.data;
+const upcomingFrom = (): string => {
+  const now = new Date();
+  now.setMinutes(0, 0, 0);
+  return now.toISOString();
+};
+
+/**
+ * Get one page of upcoming events, soonest first
+ * Pass the nextCursor of a page to get the page after it; it is missing on the last page
+ */
+export const getEvents = async (cursor?: string): Promise<EventPage> => {
+  const response = await httpClient.get("/events/", {
+    params: { limit: EVENTS_PAGE_SIZE, date_from: upcomingFrom(), cursor }
+  });
+  return {
+    events: response.data,
+    nextCursor: response.headers["x-next-cursor"] || undefined
+  };
 };
 
 /**
@@ -8,4 +8,4 @@ export type { User, UserCreate, UserUpdate } from "./user.types";
 export type { Meal, MealCreate, MealUpdate } from "./meal.types";
 
 // Event types
-export type { Event, EventCreate, EventUpdate, JoinEventRequest } from "./event.types";
+export type { Event, EventCreate, EventUpdate, JoinEventRequest, EventPage } from "./event.types";